@@ -1,3 +1,4 @@
 #!/bin/sh
 set -ex
+LANG=C xvfb-run -a /usr/bin/python3 -m unittest discover -s tests
 LANG=C exec xvfb-run -a -s '-screen 0 1024x768x24' /usr/bin/python3 test.py tests/*.dot tests/graphs/*.gv
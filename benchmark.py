@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+#
+# Copyright 2008-2022 Jose Fonseca
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+'''Micro-benchmarks for the xdot.py internals.'''
+
+
+import argparse
+import gc
+import itertools
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name, seconds, count, unit):
+    sys.stdout.write('  %-24s %9.2f ms %12.0f %s/s\n' % (name, seconds*1e3, count/seconds, unit))
+
+
+def bench_lexer(args):
+    from xdot.dot.lexer import DotLexer, TokenCursor, EOF
+    from xdot.dot.parser import DotParser
+
+    for filename in args.files:
+        buf = open(filename, 'rb').read()
+
+        def tokens():
+            lexer = DotLexer(buf=buf, filename=filename)
+            while next(lexer).type != EOF:
+                pass
+
+        def tokenize():
+            DotLexer(buf=buf, filename=filename).tokenize()
+
+        def cursor():
+            cursor = TokenCursor(DotLexer(buf=buf, filename=filename))
+            while next(cursor).type != EOF:
+                pass
+
+        def parse_tokens():
+            DotParser(DotLexer(buf=buf, filename=filename)).parse()
+
+        def parse_cursor():
+            DotParser(TokenCursor(DotLexer(buf=buf, filename=filename))).parse()
+
+        count = len(DotLexer(buf=buf).tokenize()[0])
+        sys.stdout.write('%s: %u bytes, %u tokens\n' % (filename, len(buf), count))
+        report('Lexer', best_of(tokens, args.repeat), count, 'tokens')
+        report('Lexer.tokenize', best_of(tokenize, args.repeat), count, 'tokens')
+        report('TokenCursor', best_of(cursor, args.repeat), count, 'tokens')
+        report('DotParser(Lexer)', best_of(parse_tokens, args.repeat), count, 'tokens')
+        report('DotParser(TokenCursor)', best_of(parse_cursor, args.repeat), count, 'tokens')
+
+
+def read_xdot(filename):
+    """Read an xdot file, laying out any plain dot file with graphviz."""
+    buf = open(filename, 'rb').read()
+    if b'_draw_' not in buf:
+        buf = subprocess.check_output(['dot', '-Txdot', filename])
+    return buf
+
+
+def bench_drawops(args):
+    from xdot.ui._xdotparser import XDotParser, XDotAttrParser, XDotAttrDecoder, DecodeCache
+
+    class DrawAttrsParser(XDotParser):
+        """Collect the drawing attributes, without decoding them."""
+
+        def __init__(self, xdotcode):
+            XDotParser.__init__(self, xdotcode)
+            self.attrs = []
+
+        def parse_shapes(self, attrs, names):
+            self.attrs.extend(attrs[name] for name in names if name in attrs)
+            return []
+
+    for filename in args.files:
+        parser = DrawAttrsParser(read_xdot(filename))
+        parser.parse()
+        attrs = parser.attrs
+
+        ops = 0
+
+        def counted(decode):
+            def wrapper(self):
+                nonlocal ops
+                ops += 1
+                decode(self)
+            return wrapper
+
+        class OpCounter(XDotAttrDecoder):
+            opcodes = {op: counted(decode) for op, decode in XDotAttrDecoder.opcodes.items()}
+
+        for attr in attrs:
+            OpCounter(parser, attr, parser.broken_backslashes).parse()
+
+        def decode(attr_parser):
+            for attr in attrs:
+                attr_parser(parser, attr, parser.broken_backslashes).parse()
+
+        sys.stdout.write('%s: %u attributes, %u bytes, %u ops\n' % (
+            filename, len(attrs), sum(len(attr) for attr in attrs), ops))
+        for attr_parser in (XDotAttrParser, XDotAttrDecoder):
+            report(attr_parser.__name__, best_of(lambda: decode(attr_parser), args.repeat), ops, 'ops')
+
+        def decode_cached():
+            cache = DecodeCache()
+            for attr in attrs:
+                cache.get(attr, parser.decode_draw_attr)
+            return cache
+
+        report('DecodeCache', best_of(decode_cached, args.repeat), ops, 'ops')
+        sys.stdout.write('  %s\n' % decode_cached())
+
+
+def bench_load(args):
+    from xdot.ui._xdotparser import XDotParser
+
+    for filename in args.files:
+        buf = read_xdot(filename)
+
+        parser = XDotParser(buf)
+        graph = parser.parse()
+        count = len(graph.nodes) + len(graph.edges)
+        sys.stdout.write('%s: %u bytes, %u elements\n' % (filename, len(buf), count))
+        sys.stdout.write('  decode cache: %s\n' % parser.decode_cache)
+
+        def decode_all(graph):
+            for element in graph.nodes + graph.edges:
+                element.shapes
+
+        report('eager', best_of(lambda: XDotParser(buf).parse(), args.repeat), count, 'elements')
+        report('lazy', best_of(lambda: XDotParser(buf, lazy=True).parse(), args.repeat), count, 'elements')
+        report('lazy, decode all', best_of(lambda: decode_all(XDotParser(buf, lazy=True).parse()), args.repeat), count, 'elements')
+
+
+def bench_memory(args):
+    from xdot.ui._xdotparser import XDotParser
+
+    for filename in args.files:
+        buf = read_xdot(filename)
+
+        gc.collect()
+        tracemalloc.start()
+        graph = XDotParser(buf).parse()
+        gc.collect()
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        shapes = len(graph.shapes) + sum(len(element.shapes) for element in graph.nodes + graph.edges)
+        pens = len(set(shape.pen for element in [graph] + graph.nodes + graph.edges for shape in element.shapes))
+        sys.stdout.write('%s: %u bytes, %u shapes, %u distinct pens\n' % (filename, len(buf), shapes, pens))
+        sys.stdout.write('  %-24s %9.2f MB %12.0f bytes/shape\n' % ('graph', size / 2**20, size / max(shapes, 1)))
+        sys.stdout.write('  %-24s %9.2f MB\n' % ('peak', peak / 2**20))
+
+
+def synthetic_graph(count):
+    """Lay out count nodes in a square grid, each with an edge to its right
+    neighbour, as graphviz would draw them."""
+    from xdot.ui import elements
+    from xdot.ui.pen import Pen
+
+    pen = Pen.DEFAULT
+    side = max(1, int(count**0.5))
+    nodes = []
+    edges = []
+    for i in range(count):
+        x = 100.0*(i % side) + 50.0
+        y = 100.0*(i // side) + 50.0
+        shapes = [
+            elements.EllipseShape(pen, x, y, 27.0, 18.0),
+            elements.TextShape(pen, x, y + 4.0, elements.TextShape.CENTER, 14.0, 'n%u' % i),
+        ]
+        nodes.append(elements.Node('n%u' % i, x, y, 54.0, 36.0, shapes, None, None))
+        if i % side:
+            src = nodes[-2]
+            points = [(src.x + 27.0, y), (src.x + 40.0, y), (x - 40.0, y), (x - 27.0, y)]
+            shapes = [elements.BezierShape(pen, points)]
+            edges.append(elements.Edge(src, nodes[-1], points, shapes, None, {'body': None, 'head': None, 'tail': None}))
+    return elements.Graph(100.0*side, 100.0*(count//side + 1), (), nodes, edges)
+
+
+def bench_cull(args):
+    for count in args.sizes:
+        graph = synthetic_graph(count)
+
+        # a 1000x800 viewport at the centre
+        x = graph.width/2
+        y = graph.height/2
+        bounding = (x - 500.0, y - 400.0, x + 500.0, y + 400.0)
+
+        def scan():
+            return ([node for node in graph.nodes if node._intersects(bounding)],
+                    [edge for edge in graph.edges if edge._intersects(bounding)])
+
+        def query():
+            return graph.nodes_index.query(*bounding), graph.edges_index.query(*bounding)
+
+        nodes, edges = query()
+        assert (nodes, edges) == scan()
+        visible = len(nodes) + len(edges)
+        sys.stdout.write('%u nodes, %u edges, %u visible\n' % (len(graph.nodes), len(graph.edges), visible))
+        report('scan', best_of(scan, args.repeat), 1, 'frames')
+        report('GridIndex', best_of(query, args.repeat), 1, 'frames')
+
+
+def bench_pick(args):
+    import random
+
+    for count in args.sizes:
+        graph = synthetic_graph(count)
+
+        # pointer positions, half of them over nodes or edges
+        rng = random.Random(0)
+        points = []
+        for i in range(20):
+            node = rng.choice(graph.nodes)
+            points.append((node.x + rng.uniform(-60.0, 60.0), node.y + rng.uniform(-30.0, 30.0)))
+        radius = 4.0
+
+        def scan():
+            for x, y in points:
+                for element in itertools.chain(graph.nodes, graph.edges):
+                    if element.is_inside(x, y, radius):
+                        break
+
+        def get_element():
+            for x, y in points:
+                graph.get_element(x, y, radius)
+
+        def get_all():
+            for x, y in points:
+                graph.get_url(x, y, radius) or graph.get_jump(x, y, radius)
+                graph.get_element(x, y, radius)
+
+        def pick():
+            for x, y in points:
+                graph.pick(x, y, radius)
+
+        pick()  # build the hit indices
+        sys.stdout.write('%u nodes, %u edges\n' % (len(graph.nodes), len(graph.edges)))
+        report('scan', best_of(scan, args.repeat), len(points), 'picks')
+        report('Graph.get_element', best_of(get_element, args.repeat), len(points), 'picks')
+        report('get_url+jump+element', best_of(get_all, args.repeat), len(points), 'picks')
+        report('Graph.pick', best_of(pick, args.repeat), len(points), 'picks')
+
+
+def bench_bezier(args):
+    import math
+    import random
+    from xdot.ui.elements import BezierShape
+    from xdot.ui.pen import Pen
+
+    rng = random.Random(0)
+    for count in args.segments:
+        # random curves, and points around them
+        shapes = []
+        for i in range(100):
+            points = [(rng.uniform(0.0, 300.0), rng.uniform(0.0, 300.0))]
+            for j in range(3*count):
+                x, y = points[-1]
+                points.append((x + rng.uniform(-80.0, 80.0), y + rng.uniform(-80.0, 80.0)))
+            shapes.append((BezierShape(Pen.DEFAULT, points), rng.uniform(-50.0, 350.0), rng.uniform(-50.0, 350.0)))
+
+        def roots():
+            # the closed form solution for every segment, as done originally
+            return [math.sqrt(min(shape._segment_squared_distance(x, y, i) for i in range(count)))
+                    for shape, x, y in shapes]
+
+        def flattened():
+            return [shape.get_smallest_distance(x, y) for shape, x, y in shapes]
+
+        def exact():
+            return [shape.get_smallest_distance(x, y, exact=True) for shape, x, y in shapes]
+
+        flattened()  # flatten the curves
+        reference = roots()
+        error = max(abs(a - b) for a, b in zip(flattened(), reference))
+        exact_error = max(abs(a - b) for a, b in zip(exact(), reference))
+
+        sys.stdout.write('%u segments, max error %.3g flattened, %.3g exact\n' % (count, error, exact_error))
+        report('numpy.roots', best_of(roots, args.repeat), len(shapes), 'queries')
+        report('flattened', best_of(flattened, args.repeat), len(shapes), 'queries')
+        report('flattened+exact', best_of(exact, args.repeat), len(shapes), 'queries')
+
+
+def bench_render(args):
+    import cairo
+    from xdot.ui._xdotparser import XDotParser
+    from xdot.ui.elements import Graph, TextShape
+
+    width, height = 1024, 768
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+
+    def render(graph, zoom_ratio):
+        cr = cairo.Context(surface)
+        cr.translate(0.5*width, 0.5*height)
+        cr.scale(zoom_ratio, zoom_ratio)
+        cr.translate(-0.5*graph.width, -0.5*graph.height)
+        graph.draw(cr, bounding=(0.5*graph.width - 0.5*width/zoom_ratio,
+                                 0.5*graph.height - 0.5*height/zoom_ratio,
+                                 0.5*graph.width + 0.5*width/zoom_ratio,
+                                 0.5*graph.height + 0.5*height/zoom_ratio))
+        surface.flush()
+
+    lod = Graph.node_lod_pixels, Graph.edge_lod_pixels, TextShape.min_pixels
+    for filename in args.files:
+        graph = XDotParser(read_xdot(filename), lazy=True).parse()
+        count = len(graph.nodes) + len(graph.edges)
+        sys.stdout.write('%s: %u elements\n' % (filename, count))
+        fit = min(width/graph.width, height/graph.height)
+        for zoom_ratio in (fit, 1.0):
+            report('zoom %.3g' % zoom_ratio, best_of(lambda: render(graph, zoom_ratio), args.repeat), count, 'elements')
+            Graph.node_lod_pixels = Graph.edge_lod_pixels = TextShape.min_pixels = 0
+            try:
+                report('zoom %.3g, full detail' % zoom_ratio, best_of(lambda: render(graph, zoom_ratio), args.repeat), count, 'elements')
+            finally:
+                Graph.node_lod_pixels, Graph.edge_lod_pixels, TextShape.min_pixels = lod
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument('-n', '--repeat', type=int, default=5,
+                           help='number of runs, of which the best is reported')
+    subparsers = argparser.add_subparsers(dest='benchmark', required=True)
+
+    subparser = subparsers.add_parser('lexer', help='tokenize and parse dot files')
+    subparser.add_argument('files', nargs='+')
+    subparser.set_defaults(func=bench_lexer)
+
+    subparser = subparsers.add_parser('drawops', help='decode xdot drawing attributes of xdot files, or of dot files laid out with graphviz')
+    subparser.add_argument('files', nargs='+')
+    subparser.set_defaults(func=bench_drawops)
+
+    subparser = subparsers.add_parser('load', help='parse xdot files into graphs, decoding shapes eagerly or lazily')
+    subparser.add_argument('files', nargs='+')
+    subparser.set_defaults(func=bench_load)
+
+    subparser = subparsers.add_parser('memory', help='measure the memory used by the parsed graphs of xdot files')
+    subparser.add_argument('files', nargs='+')
+    subparser.set_defaults(func=bench_memory)
+
+    subparser = subparsers.add_parser('cull', help='find the elements of synthetic graphs within a viewport')
+    subparser.add_argument('sizes', nargs='*', type=int, default=[1000, 10000, 100000])
+    subparser.set_defaults(func=bench_cull)
+
+    subparser = subparsers.add_parser('pick', help='find the elements under the pointer in synthetic graphs')
+    subparser.add_argument('sizes', nargs='*', type=int, default=[1000, 10000, 100000])
+    subparser.set_defaults(func=bench_pick)
+
+    subparser = subparsers.add_parser('bezier', help='measure distances to random Bezier curves')
+    subparser.add_argument('segments', nargs='*', type=int, default=[1, 4, 20])
+    subparser.set_defaults(func=bench_bezier)
+
+    subparser = subparsers.add_parser('render', help='render graphs, zoomed to fit and at 100%%')
+    subparser.add_argument('files', nargs='+')
+    subparser.set_defaults(func=bench_render)
+
+    args = argparser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
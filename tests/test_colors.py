@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import unittest
+
+from xdot.dot.colors import lookup_color
+
+
+class TestX11Colors(unittest.TestCase):
+
+    def assert_color(self, name, rgb):
+        color = lookup_color(name)
+        self.assertIsNotNone(color, name)
+        self.assertEqual(tuple(round(c*255) for c in color), rgb + (255,))
+
+    def test_classic(self):
+        self.assert_color('navajowhite', (255, 222, 173))
+        self.assert_color('Navajo White', (255, 222, 173))
+        self.assert_color('gray', (190, 190, 190))
+        self.assert_color('green', (0, 255, 0))
+
+    def test_web(self):
+        self.assert_color('crimson', (220, 20, 60))
+        self.assert_color('indigo', (75, 0, 130))
+        self.assert_color('teal', (0, 128, 128))
+        self.assert_color('olive', (128, 128, 0))
+        self.assert_color('lime', (0, 255, 0))
+        self.assert_color('aqua', (0, 255, 255))
+        self.assert_color('fuchsia', (255, 0, 255))
+        self.assert_color('silver', (192, 192, 192))
+        self.assert_color('rebeccapurple', (102, 51, 153))
+
+    def test_web_and_x11_variants(self):
+        self.assert_color('webgray', (128, 128, 128))
+        self.assert_color('x11gray', (190, 190, 190))
+        self.assert_color('webmaroon', (128, 0, 0))
+        self.assert_color('x11maroon', (176, 48, 96))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import math
+import random
+import unittest
+
+from xdot.ui.elements import BezierShape, Graph, Node
+from xdot.ui.pen import Pen
+
+
+def sampled_distance(points, x, y, samples=1000):
+    """Distance to a bezier curve, by sampling it densely."""
+    result = math.inf
+    for i in range(0, len(points) - 1, 3):
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points[i:i + 4]
+        for k in range(samples + 1):
+            t = k/samples
+            s = 1 - t
+            px = s*s*s*x0 + 3*s*s*t*x1 + 3*s*t*t*x2 + t*t*t*x3
+            py = s*s*s*y0 + 3*s*s*t*y1 + 3*s*t*t*y2 + t*t*t*y3
+            result = min(result, math.hypot(px - x, py - y))
+    return result
+
+
+class TestBezierDistance(unittest.TestCase):
+
+    def random_curves(self, segments, count=50):
+        """Random curves, and points around them."""
+        rng = random.Random(segments)
+        for i in range(count):
+            points = [(rng.uniform(0.0, 300.0), rng.uniform(0.0, 300.0))]
+            for j in range(3*segments):
+                x, y = points[-1]
+                points.append((x + rng.uniform(-80.0, 80.0), y + rng.uniform(-80.0, 80.0)))
+            yield points, BezierShape(Pen.DEFAULT, points), rng.uniform(-50.0, 350.0), rng.uniform(-50.0, 350.0)
+
+    def check_accuracy(self, segments):
+        for points, shape, x, y in self.random_curves(segments):
+            reference = math.sqrt(min(shape._segment_squared_distance(x, y, i) for i in range(segments)))
+            # the closed form solution itself, against a dense sampling
+            self.assertAlmostEqual(reference, sampled_distance(points, x, y), delta=0.05)
+            self.assertLessEqual(abs(shape.get_smallest_distance(x, y) - reference), BezierShape.flatness)
+            self.assertAlmostEqual(shape.get_smallest_distance(x, y, exact=True), reference, delta=1e-6)
+
+    def test_one_segment(self):
+        self.check_accuracy(1)
+
+    def test_few_segments(self):
+        self.check_accuracy(4)
+
+    def test_many_segments(self):
+        self.check_accuracy(20)
+
+    def test_on_curve(self):
+        points = [(0.0, 0.0), (10.0, 20.0), (30.0, 20.0), (40.0, 0.0)]
+        shape = BezierShape(Pen.DEFAULT, points)
+        for x, y in points[::3] + [(20.0, 15.0)]:
+            self.assertLessEqual(shape.get_smallest_distance(x, y), BezierShape.flatness)
+            self.assertAlmostEqual(shape.get_smallest_distance(x, y, exact=True), 0.0, delta=1e-6)
+
+
+class RecordingContext:
+    """Cairo context stand-in, which records the boxes filled per color."""
+
+    def __init__(self):
+        self.source = None
+        self.path = []
+        self.fills = []
+
+    def set_source_rgba(self, *color):
+        self.source = color
+
+    def rectangle(self, x, y, w, h):
+        self.path.append((x, y, w, h))
+
+    def fill(self):
+        self.fills.append((self.source, self.path))
+        self.path = []
+
+
+class TestSimplifiedDrawing(unittest.TestCase):
+
+    def test_colors(self):
+        red = (1.0, 0.0, 0.0, 1.0)
+        blue = (0.0, 0.0, 1.0, 1.0)
+        nodes = [
+            Node('a', 0, 0, 10, 10, [], None, None, simplified_color=red),
+            Node('b', 20, 0, 10, 10, [], None, None, simplified_color=blue),
+            Node('c', 40, 0, 10, 10, [], None, None, simplified_color=red),
+            Node('d', 60, 0, 10, 10, [], None, None),
+        ]
+
+        cr = RecordingContext()
+        Graph._draw_simplified(cr, nodes, False)
+        fills = {color: len(boxes) for color, boxes in cr.fills}
+        self.assertEqual(len(cr.fills), 3)
+        self.assertEqual(fills, {red: 2, blue: 1, Pen.DEFAULT.color: 1})
+
+        # highlighted elements all have the same color
+        cr = RecordingContext()
+        Graph._draw_simplified(cr, nodes, True)
+        self.assertEqual([(color, len(boxes)) for color, boxes in cr.fills],
+                         [(Pen.DEFAULT.highlighted().color, 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
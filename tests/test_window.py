@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import types
+import unittest
+
+from xdot.ui._xdotparser import XDotParser
+from xdot.ui.window import DotWidget
+
+
+GRAPH_XDOT = b'''digraph G {
+    graph [bb="0,0,200,100", xdotversion=1.7];
+    a [height=0.5, pos="27,50", width=0.75, _draw_="c 7 -#000000 e 27 50 27 18 "];
+    b [height=0.5, pos="173,50", width=0.75, _draw_="c 7 -#000000 e 173 50 27 18 "];
+}
+'''
+
+
+class HighlightWidget:
+    """Stand-in for a DotWidget, with its highlight methods, which records
+    the areas invalidated."""
+
+    set_highlight = DotWidget.set_highlight
+    _queue_draw_highlight = DotWidget._queue_draw_highlight
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.highlight = None
+        self.highlight_search = False
+        self.x, self.y = 100.0, 50.0
+        self.zoom_ratio = 1.0
+        self.areas = []
+
+    def get_allocation(self):
+        return types.SimpleNamespace(width=200, height=100)
+
+    def queue_draw_area(self, x, y, width, height):
+        self.areas.append((x, y, width, height))
+
+    def queue_draw(self):
+        self.areas.append(None)
+
+
+class TestSetHighlight(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = XDotParser(GRAPH_XDOT).parse()
+        self.widget = HighlightWidget(self.graph)
+
+    def test_empty(self):
+        # as set by a search without matches
+        self.widget.set_highlight([], search=True)
+        self.assertEqual(self.widget.highlight, [])
+        self.assertEqual(self.widget.areas, [])
+
+    def test_damage(self):
+        a, b = self.graph.nodes
+        self.widget.set_highlight({a})
+        self.assertEqual(self.widget.highlight, {a})
+        (x, y, width, height), = self.widget.areas
+        self.assertLessEqual(x, 0)
+        self.assertLessEqual(x + width, 100)
+
+        # both the previously and the newly highlighted nodes
+        self.widget.areas = []
+        self.widget.set_highlight({b})
+        (x, y, width, height), = self.widget.areas
+        self.assertLessEqual(x, 0)
+        self.assertGreaterEqual(x + width, 200)
+
+        self.widget.areas = []
+        self.widget.set_highlight(None)
+        self.assertIsNone(self.widget.highlight)
+        (x, y, width, height), = self.widget.areas
+        self.assertGreaterEqual(x, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+import unittest
+
+from xdot.ui._xdotparser import XDotParser
+
+
+# a fixed size node, whose label is much wider than it
+FIXEDSIZE_XDOT = b'''digraph G {
+    graph [bb="0,0,200,100", xdotversion=1.7];
+    a [fixedsize=true, height=0.5, pos="100,50", width=0.5,
+       _draw_="c 7 -#000000 e 100 50 18 18 ",
+       _ldraw_="F 14 11 -Times-Roman c 7 -#000000 T 100 46 0 150 24 -a_very_long_label_text "];
+}
+'''
+
+
+# a filled node, an unfilled node, and an edge, of different colors
+COLORS_XDOT = b'''digraph G {
+    graph [bb="0,0,200,100", xdotversion=1.7];
+    a [height=0.5, pos="27,50", width=0.75,
+       _draw_="c 7 -#000000 C 7 -#ff0000 E 27 50 27 18 "];
+    b [height=0.5, pos="173,50", width=0.75,
+       _draw_="c 7 -#0000ff e 173 50 27 18 "];
+    a -> b [pos="e,146,50 54,50 80,50 110,50 136,50",
+            _draw_="c 7 -#008000 B 4 54 50 80 50 110 50 136 50 "];
+}
+'''
+
+
+class TestLazyBounds(unittest.TestCase):
+
+    def assert_label_inside(self, node):
+        x0, y0, x1, y1 = node.bounding
+        self.assertLessEqual(x0, 25)
+        self.assertGreaterEqual(x1, 175)
+
+    def test_fixedsize(self):
+        graph = XDotParser(FIXEDSIZE_XDOT, lazy=True).parse()
+        self.assert_label_inside(graph.nodes[0])
+
+    def test_fixedsize_keep_attrs(self):
+        graph = XDotParser(FIXEDSIZE_XDOT, keep_attrs=XDotParser.draw_attrs, lazy=True).parse()
+        self.assert_label_inside(graph.nodes[0])
+
+
+class TestSimplifiedColors(unittest.TestCase):
+
+    def check_colors(self, lazy):
+        graph = XDotParser(COLORS_XDOT, lazy=lazy).parse()
+        a, b = graph.nodes
+        edge, = graph.edges
+        # fill color of filled nodes, and pen color otherwise
+        self.assertEqual(a.simplified_color, (1.0, 0.0, 0.0, 1.0))
+        self.assertEqual(b.simplified_color, (0.0, 0.0, 1.0, 1.0))
+        self.assertEqual(edge.simplified_color, (0.0, 128/255, 0.0, 1.0))
+
+    def test_eager(self):
+        self.check_colors(lazy=False)
+
+    def test_lazy(self):
+        self.check_colors(lazy=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
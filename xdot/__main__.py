@@ -37,6 +37,7 @@ Shortcuts:
   Q                         quit
   P                         print
   T                         toggle show/hide toolbar
+  [, ]                      previous/next graph
   Escape                    halt animation
   Ctrl-drag                 zoom in/out
   Shift-drag                zooms an area
@@ -63,6 +64,10 @@ Shortcuts:
         '--hide-toolbar',
         action='store_true', dest='hide_toolbar',
         help='Hides the toolbar on start.')
+    parser.add_argument(
+        '--tiled',
+        action='store_true', dest='tiled',
+        help='draw the graph from cached image tiles, for smoother panning of large graphs')
 
     options = parser.parse_args()
     inputfile = options.inputfile
@@ -77,6 +82,8 @@ Shortcuts:
     win = DotWindow(width=width, height=height)
     win.connect('delete-event', Gtk.main_quit)
     win.set_filter(options.filter)
+    if options.tiled:
+        win.dotwidget.set_tiled(True)
     if inputfile and len(inputfile) >= 1:
         if inputfile == '-':
             win.set_dotcode(sys.stdin.buffer.read())
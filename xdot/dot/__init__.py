@@ -1 +1 @@
-__all__ = ['lexer', 'parser']
+__all__ = ['colors', 'lexer', 'parser']
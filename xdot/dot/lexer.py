@@ -13,13 +13,16 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+import bisect
 import os
 import re
+from array import array
 
 from .scanner import DotScanner
 
 EOF = -1
 SKIP = -2
+ERROR = -3
 
 ID = 0
 STR_ID = 1
@@ -27,12 +30,23 @@ HTML_ID = 2
 
 
 class Token:
+    """Token referring to a span of the lexer buffer.
 
-    def __init__(self, type, text, line, col):
+    The view is a zero-copy memoryview of the token value.  The text is only
+    copied out of the buffer (and unescaped, when needed) on demand."""
+
+    def __init__(self, type, pos, view, unescape=None):
         self.type = type
-        self.text = text
-        self.line = line
-        self.col = col
+        self.pos = pos
+        self.view = view
+        self.unescape = unescape
+
+    @property
+    def text(self):
+        text = self.view.tobytes()
+        if self.unescape is not None:
+            text = self.unescape(text)
+        return text
 
 
 class ParseError(Exception):
@@ -57,104 +71,288 @@ class Lexer:
 
     newline_re = re.compile(br'\r\n?|\n')
 
-    def __init__(self, buf=None, pos=0, filename=None, fp=None):
+    # size of the chunks read in streaming mode
+    chunksize = 64*1024
+
+    def __init__(self, buf=None, pos=0, filename=None, fp=None, stream=False):
+        self.stream = None
         if fp is not None:
-            try:
-                fileno = fp.fileno()
-                length = os.path.getsize(fp.name)
-                import mmap
-            except:
-                # read whole file into memory
-                buf = fp.read()
+            if stream:
+                # read the file incrementally, in chunks
+                self.stream = fp
+                buf = b''
                 pos = 0
             else:
-                # map the whole file into memory
-                if length:
-                    # length must not be zero
-                    buf = mmap.mmap(fileno, length, access=mmap.ACCESS_READ)
-                    pos = os.lseek(fileno, 0, 1)
-                else:
-                    buf = b''
+                try:
+                    fileno = fp.fileno()
+                    length = os.path.getsize(fp.name)
+                    import mmap
+                except:
+                    # read whole file into memory
+                    buf = fp.read()
                     pos = 0
+                else:
+                    # map the whole file into memory
+                    if length:
+                        # length must not be zero
+                        buf = mmap.mmap(fileno, length, access=mmap.ACCESS_READ)
+                        pos = os.lseek(fileno, 0, 1)
+                    else:
+                        buf = b''
+                        pos = 0
 
             if filename is None:
                 try:
                     filename = fp.name
                 except AttributeError:
                     filename = None
+                else:
+                    # pipes are named after their file descriptor
+                    if not isinstance(filename, str):
+                        filename = None
 
         self.buf = buf
         self.pos = pos
-        self.line = 1
-        self.col = 1
+        self.start = pos
+        self.endpos = None
         self.filename = filename
 
+        # offsets of the start of every line, built on demand
+        self.line_starts = None
+
+        # stream offset, line, and column of the start of the buffer, which
+        # only change in streaming mode, as consumed data gets discarded
+        self.base = 0
+        self.base_line = 1
+        self.base_col = 1
+
+        self._view = None
+
+    @property
+    def view(self):
+        """Zero-copy view of the whole buffer."""
+        if self._view is None:
+            self._view = memoryview(self.buf)
+        return self._view
+
+    def seek(self, pos, endpos=None):
+        """Restrict lexing to the given range of the buffer.
+
+        Unlike the pos argument of the constructor, line numbers are still
+        counted from the start of the buffer."""
+        assert self.stream is None
+        self.pos = pos
+        self.endpos = endpos
+
+    def fill(self):
+        """Discard the consumed data, and read more data from the stream.
+
+        Returns False when the end of the stream has been reached."""
+        pos = self.pos
+        buf = self.buf
+        self.base_line, self.base_col = self.advance(self.base_line, self.base_col, buf[:pos])
+        self.base += pos
+        # grow the reads geometrically, so that huge tokens spanning many
+        # chunks don't get rescanned over and over again
+        data = self.stream.read(max(self.chunksize, len(buf) - pos))
+        if not data:
+            self.stream = None
+        self.buf = buf[pos:] + data
+        self.pos = 0
+        self._view = None
+        return self.stream is not None
+
     def __next__(self):
         while True:
-            # save state
             pos = self.pos
-            line = self.line
-            col = self.col
-
-            type, text, endpos = self.scanner.next(self.buf, pos)
-            assert isinstance(text, bytes)
-            assert pos + len(text) == endpos
-            self.consume(text)
-            type, text = self.filter(type, text)
+            type, endpos = self.scanner.match(self.buf, pos, self.endpos)
+
+            if self.stream is not None and (type is None or endpos >= len(self.buf)):
+                # the token might continue beyond the end of the buffer
+                self.fill()
+                continue
+
             self.pos = endpos
 
             if type == SKIP:
                 continue
             elif type is None:
-                msg = 'unexpected char %r' % (text,)
+                msg = 'unexpected char %r' % (self.buf[pos:endpos],)
+                line, col = self.position(self.base + pos)
                 raise ParseError(msg, self.filename, line, col)
             else:
                 break
-        return Token(type=type, text=text, line=line, col=col)
-
-    def consume(self, text):
-        # update line number
-        pos = 0
-        for mo in self.newline_re.finditer(text, pos):
-            self.line += 1
-            self.col = 1
-            pos = mo.end()
-
-        # update column number
+        type, start, end, escaped = self.filter(type, pos, endpos)
+        view = self.view[start:end]
+        return Token(type, self.base + pos, view, self.unescape if escaped else None)
+
+    def filter(self, type, start, end):
+        """Map a token to the type seen by the parser and the span of its
+        value, and tell whether the value needs to be unescaped."""
+        return type, start, end, False
+
+    def unescape(self, text):
+        return text
+
+    def tokenize(self):
+        """Scan the remaining buffer in one pass into parallel arrays of
+        token types, start offsets, and end offsets."""
+        if self.stream is not None:
+            raise ValueError('streams can only be tokenized incrementally')
+        return self.scanner.scan(self.buf, self.pos, self.endpos)
+
+    def advance(self, line, col, text):
+        """Compute the line and column reached after the given text."""
+        newlines = text.count(b'\n') + text.count(b'\r') - text.count(b'\r\n')
+        if newlines:
+            line += newlines
+            col = 1
+            pos = max(text.rfind(b'\n'), text.rfind(b'\r')) + 1
+        else:
+            pos = 0
+
+        # expand tabs
         while True:
             tabpos = text.find(b'\t', pos)
             if tabpos == -1:
                 break
-            self.col += tabpos - pos
-            self.col = ((self.col - 1) // self.tabsize + 1) * self.tabsize + 1
+            col += tabpos - pos
+            col = ((col - 1) // self.tabsize + 1) * self.tabsize + 1
             pos = tabpos + 1
-        self.col += len(text) - pos
+        col += len(text) - pos
+
+        return line, col
+
+    def position(self, offset):
+        """Compute the line and column of the given offset.
+
+        Line numbers are looked up in an index of newline offsets, which is
+        only built the first time a position is asked for.  In streaming
+        mode, only offsets within the current buffer can be resolved."""
+        if self.base or self.stream is not None:
+            assert offset >= self.base
+            return self.advance(self.base_line, self.base_col, self.buf[:offset - self.base])
+
+        line_starts = self.line_starts
+        if line_starts is None:
+            line_starts = array('q', [self.start])
+            line_starts.extend([mo.end() for mo in self.newline_re.finditer(self.buf, self.start)])
+            self.line_starts = line_starts
+        index = bisect.bisect_right(line_starts, offset) - 1
+        line_start = line_starts[index]
+        return self.advance(index + 1, 1, self.buf[line_start:offset])
+
+    @property
+    def line(self):
+        return self.position(self.base + self.pos)[0]
+
+    @property
+    def col(self):
+        return self.position(self.base + self.pos)[1]
+
+
+class TokenCursor:
+    """Walk over the token arrays produced by Lexer.tokenize.
+
+    This can be passed to a parser in place of the lexer.  The cursor is its
+    own lookahead token, so no Token object is allocated per token, and token
+    text is only sliced from the buffer when asked for."""
+
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.filename = lexer.filename
+        self.types, self.starts, self.ends = lexer.tokenize()
+        if lexer.endpos is None:
+            self.endpos = len(lexer.buf)
+        else:
+            self.endpos = lexer.endpos
+        self.index = -1
+        self.type = None
+        self.raw_type = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        index = self.index + 1
+        if index >= len(self.types):
+            self.index = len(self.types)
+            self.type = self.raw_type = EOF
+            return self
+        self.index = index
+        type = self.types[index]
+        if type == ERROR:
+            msg = 'unexpected char %r' % (self.lexer.buf[self.start:self.end],)
+            line, col = self.position(self.start)
+            raise ParseError(msg, self.filename, line, col)
+        self.raw_type = type
+        if type == STR_ID or type == HTML_ID:
+            type = ID
+        self.type = type
+        return self
+
+    @property
+    def start(self):
+        try:
+            return self.starts[self.index]
+        except IndexError:
+            return self.endpos
+
+    @property
+    def end(self):
+        try:
+            return self.ends[self.index]
+        except IndexError:
+            return self.endpos
+
+    pos = start
+
+    @property
+    def view(self):
+        type, start, end, escaped = self.lexer.filter(self.raw_type, self.start, self.end)
+        return self.lexer.view[start:end]
+
+    @property
+    def text(self):
+        type, start, end, escaped = self.lexer.filter(self.raw_type, self.start, self.end)
+        text = self.lexer.buf[start:end]
+        if escaped:
+            text = self.lexer.unescape(text)
+        return text
+
+    def position(self, offset):
+        return self.lexer.position(offset)
 
 
 class DotLexer(Lexer):
 
     scanner = DotScanner()
 
-    def filter(self, type, text):
+    def filter(self, type, start, end):
         # TODO: handle charset
         if type == STR_ID:
-            text = text[1:-1]
+            start += 1
+            end -= 1
+            # only strings with backslashes need to be unescaped, which
+            # excludes most xdot drawing attributes
+            escaped = self.buf.find(b'\\', start, end) != -1
+            return ID, start, end, escaped
 
-            # line continuations
-            text = text.replace(b'\\\r\n', b'')
-            text = text.replace(b'\\\r', b'')
-            text = text.replace(b'\\\n', b'')
+        elif type == HTML_ID:
+            return ID, start + 1, end - 1, False
 
-            # quotes
-            text = text.replace(b'\\"', b'"')
+        return type, start, end, False
 
-            # layout engines recognize other escape codes (many non-standard)
-            # but we don't translate them here
+    def unescape(self, text):
+        # line continuations
+        text = text.replace(b'\\\r\n', b'')
+        text = text.replace(b'\\\r', b'')
+        text = text.replace(b'\\\n', b'')
 
-            type = ID
+        # quotes
+        text = text.replace(b'\\"', b'"')
 
-        elif type == HTML_ID:
-            text = text[1:-1]
-            type = ID
+        # layout engines recognize other escape codes (many non-standard)
+        # but we don't translate them here
 
-        return type, text
+        return text
@@ -16,7 +16,7 @@
 
 import sys
 
-from .lexer import ParseError, DotLexer
+from .lexer import ParseError, DotLexer, TokenCursor
 
 
 EOF = -1
@@ -58,22 +58,22 @@ class Parser:
         self.lexer = lexer
         self.lookahead = next(self.lexer)
 
+    def error(self, msg):
+        line, col = self.lexer.position(self.lookahead.pos)
+        return ParseError(
+            msg=msg,
+            filename=self.lexer.filename,
+            line=line,
+            col=col)
+
     def match(self, type):
         if self.lookahead.type != type:
-            raise ParseError(
-                msg='unexpected token {}'.format(self.lookahead.text),
-                filename=self.lexer.filename,
-                line=self.lookahead.line,
-                col=self.lookahead.col)
+            raise self.error('unexpected token {}'.format(self.lookahead.text))
 
     def skip(self, type):
         while self.lookahead.type != type:
             if self.lookahead.type == EOF:
-                raise ParseError(
-                    msg='unexpected end of file',
-                    filename=self.lexer.filename,
-                    line=self.lookahead.line,
-                    col=self.lookahead.col)
+                raise self.error('unexpected end of file')
             self.consume()
 
     def consume(self):
@@ -84,18 +84,77 @@ class Parser:
 
 class DotParser(Parser):
 
+    def __init__(self, lexer, keep_attrs=None):
+        Parser.__init__(self, lexer)
+
+        # Names of the attributes to keep, or None to keep all of them.  The
+        # values of other attributes are skipped without ever being copied
+        # out of the lexer buffer.
+        if keep_attrs is not None:
+            keep_attrs = frozenset([name.encode('utf-8') for name in keep_attrs])
+        self.keep_attrs = keep_attrs
+
     def parse(self):
         self.parse_graph()
+        self.parse_end()
+
+    def parse_end(self):
         if self.lookahead.type != EOF:
             # Multiple graphs beyond the first are ignored
             # https://github.com/jrfonseca/xdot.py/issues/112
+            line, col = self.lexer.position(self.lookahead.pos)
             sys.stderr.write('warning: {}:{}:{}: ignoring extra token {}\n'.format(
                 self.lexer.filename,
-                self.lookahead.line,
-                self.lookahead.col,
+                line,
+                col,
                 self.lookahead.text
             ))
 
+    def iter_events(self):
+        """Parse the graph incrementally, yielding a (kind, id, attrs) tuple
+        per graph, node, and edge statement as soon as it is parsed.
+
+        kind is 'graph', 'node', or 'edge', and id is respectively None, the
+        node id, or a (src_id, dst_id) tuple.  The handle_* hooks are bypassed,
+        so nothing gets accumulated while iterating."""
+        events = []
+        self.handle_graph = lambda attrs: events.append(('graph', None, attrs))
+        self.handle_node = lambda id, attrs: events.append(('node', id, attrs))
+        self.handle_edge = lambda src_id, dst_id, attrs: events.append(('edge', (src_id, dst_id), attrs))
+        try:
+            if self.lookahead.type == STRICT:
+                self.consume()
+            self.skip(LCURLY)
+            self.consume()
+            yield from self._iter_stmts(events)
+            self.consume()
+            self.parse_end()
+        finally:
+            del self.handle_graph, self.handle_node, self.handle_edge
+
+    def _iter_stmts(self, events):
+        while self.lookahead.type != RCURLY:
+            if self.lookahead.type in (SUBGRAPH, LCURLY):
+                # same as parse_stmt, but without parsing the whole subgraph
+                # in one go
+                if self.lookahead.type == SUBGRAPH:
+                    self.consume()
+                    if self.lookahead.type == ID:
+                        id = self.lookahead.text
+                        self.consume()
+                        # A subgraph is also a node.
+                        self.handle_node(id, {})
+                if self.lookahead.type == LCURLY:
+                    self.consume()
+                    yield from self._iter_stmts(events)
+                    self.consume()
+                if self.lookahead.type == SEMI:
+                    self.consume()
+            else:
+                self.parse_stmt()
+            yield from events
+            del events[:]
+
     def parse_graph(self):
         if self.lookahead.type == STRICT:
             self.consume()
@@ -156,12 +215,17 @@ class DotParser(Parser):
 
     def parse_attrs(self):
         attrs = {}
+        keep_attrs = self.keep_attrs
         while self.lookahead.type == LSQUARE:
             self.consume()
             while self.lookahead.type != RSQUARE:
-                name, value = self.parse_attr()
-                name = name.decode('utf-8')
-                attrs[name] = value
+                name = self.parse_id()
+                if keep_attrs is None or name in keep_attrs:
+                    value = self.parse_attr_value()
+                    name = name.decode('utf-8')
+                    attrs[name] = value
+                else:
+                    self.skip_attr_value()
                 if self.lookahead.type == COMMA:
                     self.consume()
             self.consume()
@@ -169,12 +233,21 @@ class DotParser(Parser):
 
     def parse_attr(self):
         name = self.parse_id()
+        value = self.parse_attr_value()
+        return name, value
+
+    def parse_attr_value(self):
         if self.lookahead.type == EQUAL:
             self.consume()
-            value = self.parse_id()
+            return self.parse_id()
         else:
-            value = b'true'
-        return name, value
+            return b'true'
+
+    def skip_attr_value(self):
+        if self.lookahead.type == EQUAL:
+            self.consume()
+            self.match(ID)
+            self.consume()
 
     def parse_node_id(self):
         node_id = self.parse_id()
@@ -208,3 +281,29 @@ class DotParser(Parser):
     def handle_edge(self, src_id, dst_id, attrs):
         pass
 
+
+class GraphIndex:
+    """Index of the top-level graphs of a buffer with multiple graphs.
+
+    The index is built with a fast brace-depth scan, so that graphs can be
+    iterated lazily, or any graph opened directly, without tokenizing the
+    graphs before it."""
+
+    def __init__(self, buf, filename=None):
+        self.buf = buf
+        self.filename = filename
+        self.spans = DotLexer.scanner.index_graphs(buf)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def lexer(self, index):
+        """Create a lexer for the given graph, to be passed to a parser."""
+        start, end = self.spans[index]
+        lexer = DotLexer(buf=self.buf, filename=self.filename)
+        lexer.seek(start, end)
+        return TokenCursor(lexer)
+
+    def __iter__(self):
+        for index in range(len(self.spans)):
+            yield self.lexer(index)
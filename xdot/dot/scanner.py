@@ -13,10 +13,12 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+import array
 import re
 
 EOF = -1
 SKIP = -2
+ERROR = -3
 
 ID = 0
 STR_ID = 1
@@ -60,6 +62,22 @@ class Scanner:
             flags
         )
 
+        # Bulk scanning regular expression.  Each match swallows any leading
+        # whitespace/comments, followed by one token, symbol, or (as last
+        # resort) any other single char.
+        skip = [regexp for type, regexp, test_lit in self.tokens if type == SKIP]
+        self.group_tokens = [(type, test_lit)
+                             for type, regexp, test_lit in self.tokens
+                             if type != SKIP]
+        self.scan_re = re.compile(
+            b'(?:' + b'|'.join(skip) + b')*(?:' +
+            b'|'.join([b'(' + regexp + b')'
+                       for type, regexp, test_lit in self.tokens
+                       if type != SKIP]) +
+            b'|(.)|\\Z)',
+            flags
+        )
+
     def next(self, buf, pos):
         if pos >= len(buf):
             return EOF, b'', pos
@@ -75,6 +93,60 @@ class Scanner:
             c = buf[pos:pos+1]
             return self.symbols.get(c, None), c, pos + 1
 
+    def match(self, buf, pos, endpos=None):
+        """Like next, but returns the token end offset instead of copying
+        the token text out of the buffer."""
+        if endpos is None:
+            endpos = len(buf)
+        if pos >= endpos:
+            return EOF, pos
+        mo = self.tokens_re.match(buf, pos, endpos)
+        if mo:
+            type, regexp, test_lit = self.tokens[mo.lastindex - 1]
+            if test_lit:
+                type = self.literals.get(mo.group(), type)
+            return type, mo.end()
+        else:
+            return self.symbols.get(buf[pos:pos+1], None), pos + 1
+
+    def scan(self, buf, pos=0, endpos=None):
+        """Scan the whole buffer in one pass.
+
+        Returns three parallel arrays with the type, start offset, and end
+        offset of every token.  Whitespace and comments are dropped, and
+        unexpected chars are reported as ERROR tokens."""
+        types = array.array('b')
+        starts = array.array('q')
+        ends = array.array('q')
+        append_type = types.append
+        append_start = starts.append
+        append_end = ends.append
+
+        group_tokens = self.group_tokens
+        num_groups = len(group_tokens)
+        symbols = self.symbols
+        literals = self.literals
+
+        if endpos is None:
+            endpos = len(buf)
+        for mo in self.scan_re.finditer(buf, pos, endpos):
+            index = mo.lastindex
+            if index is None:
+                # trailing whitespace
+                break
+            if index > num_groups:
+                type = symbols.get(mo.group(index), ERROR)
+            else:
+                type, test_lit = group_tokens[index - 1]
+                if test_lit:
+                    type = literals.get(mo.group(index), type)
+            start, end = mo.span(index)
+            append_type(type)
+            append_start(start)
+            append_end(end)
+
+        return types, starts, ends
+
 
 class DotScanner(Scanner):
 
@@ -128,3 +200,42 @@ class DotScanner(Scanner):
     }
 
     ignorecase = True
+
+    # strings, comments, and HTML IDs (which may contain braces), or braces
+    braces_re = re.compile(
+        br'"[^"\\]*(?:\\.[^"\\]*)*"|'
+        br'//[^\r\n]*|'
+        br'/\*.*?\*/|'
+        br'#[^\r\n]*|'
+        br'<[^<>]*(?:<[^<>]*>[^<>]*)*>|'
+        br'([{}])',
+        re.DOTALL
+    )
+
+    def index_graphs(self, buf, pos=0, endpos=None):
+        """Find where each top-level graph starts and ends by tracking the
+        brace depth, without tokenizing.
+
+        Returns a list of (start, end) offset pairs.  A buffer without any
+        graph is returned as a single span, so that parsing it reports the
+        appropriate error."""
+        if endpos is None:
+            endpos = len(buf)
+        spans = []
+        start = pos
+        depth = 0
+        for mo in self.braces_re.finditer(buf, pos, endpos):
+            brace = mo.group(1)
+            if brace is None:
+                continue
+            if brace == b'{':
+                depth += 1
+            elif depth:
+                depth -= 1
+                if not depth:
+                    end = mo.end()
+                    spans.append((start, end))
+                    start = end
+        if depth or not spans:
+            spans.append((start, endpos))
+        return spans
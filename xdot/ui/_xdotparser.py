@@ -14,17 +14,19 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-import colorsys
+import collections
 import re
 import sys
+from itertools import islice
 from typing import Union
 
+import numpy
 from packaging.version import Version
 
-from ..dot.lexer import DotLexer
-from ..dot.parser import DotParser
+from ..dot.lexer import DotLexer, TokenCursor
+from ..dot.parser import DotParser, GraphIndex
 
-from ..ui.colors import lookup_color
+from ..dot.colors import resolve_color
 from ..ui.pen import Pen
 from ..ui import elements
 
@@ -47,7 +49,7 @@ class XDotAttrParser:
         self.buf = buf
         self.pos = 0
 
-        self.pen = Pen()
+        self.pen = Pen.DEFAULT
         self.shapes = []
 
     def __bool__(self):
@@ -94,30 +96,7 @@ class XDotAttrParser:
         return p
 
     def read_color(self):
-        # See http://www.graphviz.org/doc/info/attrs.html#k:color
-        c = self.read_text()
-        c1 = c[:1]
-        if c1 == '#':
-            hex2float = lambda h: float(int(h, 16)/255.0)
-            r = hex2float(c[1:3])
-            g = hex2float(c[3:5])
-            b = hex2float(c[5:7])
-            try:
-                a = hex2float(c[7:9])
-            except (IndexError, ValueError):
-                a = 1.0
-            return r, g, b, a
-        elif c1.isdigit() or c1 == ".":
-            # "H,S,V" or "H S V" or "H, S, V" or any other variation
-            h, s, v = map(float, c.replace(",", " ").split())
-            r, g, b = colorsys.hsv_to_rgb(h, s, v)
-            a = 1.0
-            return r, g, b, a
-        elif c1 == "[" or c1 == "(":
-            sys.stderr.write('warning: color gradients not supported yet\n')
-            return None
-        else:
-            return lookup_color(c)
+        return resolve_color(self.read_text())
 
     def parse(self):
         s = self
@@ -196,33 +175,34 @@ class XDotAttrParser:
 
     def handle_color(self, color, filled=False):
         if filled:
-            self.pen.fillcolor = color
+            self.pen = self.pen.replace(fillcolor=color)
         else:
-            self.pen.color = color
+            self.pen = self.pen.replace(color=color)
 
     def handle_linewidth(self, linewidth):
-        self.pen.linewidth = linewidth
+        self.pen = self.pen.replace(linewidth=linewidth)
 
     def handle_linestyle(self, style):
         if style == "solid":
-            self.pen.dash = ()
+            self.pen = self.pen.replace(dash=())
         elif style == "dashed":
-            self.pen.dash = (6, )       # 6pt on, 6pt off
+            self.pen = self.pen.replace(dash=(6, ))       # 6pt on, 6pt off
         elif style == "dotted":
-            self.pen.dash = (2, 4)       # 2pt on, 4pt off
+            self.pen = self.pen.replace(dash=(2, 4))       # 2pt on, 4pt off
 
     def handle_font(self, size, name):
-        self.pen.fontsize = size
-        self.pen.fontname = name
+        self.pen = self.pen.replace(fontsize=size, fontname=name)
 
     def handle_font_characteristics(self, flags):
-        self.pen.bold = bool(flags & Pen.BOLD)
-        self.pen.italic = bool(flags & Pen.ITALIC)
-        self.pen.underline = bool(flags & Pen.UNDERLINE)
-        self.pen.superscript = bool(flags & Pen.SUPERSCRIPT)
-        self.pen.subscript = bool(flags & Pen.SUBSCRIPT)
-        self.pen.strikethrough = bool(flags & Pen.STRIKE_THROUGH)
-        self.pen.overline = bool(flags & Pen.OVERLINE)
+        self.pen = self.pen.replace(
+            bold=bool(flags & Pen.BOLD),
+            italic=bool(flags & Pen.ITALIC),
+            underline=bool(flags & Pen.UNDERLINE),
+            superscript=bool(flags & Pen.SUPERSCRIPT),
+            subscript=bool(flags & Pen.SUBSCRIPT),
+            strikethrough=bool(flags & Pen.STRIKE_THROUGH),
+            overline=bool(flags & Pen.OVERLINE),
+        )
         if self.pen.overline:
             sys.stderr.write('warning: overlined text not supported yet\n')
 
@@ -254,13 +234,231 @@ class XDotAttrParser:
         self.shapes.append(elements.PolygonShape(self.pen, points))
 
 
+class XDotAttrDecoder(XDotAttrParser):
+    """Faster drop-in replacement for XDotAttrParser.
+
+    The whole attribute is split into whitespace separated fields in a single
+    pass, and operations are dispatched through a table.  Only texts which
+    contain whitespace themselves need to be looked up in the buffer."""
+
+    field_re = re.compile(br'\S+')
+
+    def __init__(self, parser, buf, broken_backslashes):
+        XDotAttrParser.__init__(self, parser, buf, broken_backslashes)
+        self.fields = self.buf.split()
+        self.index = 0
+
+    def read_fields(self, n):
+        index = self.index
+        self.index = index + n
+        return self.fields[index:index + n]
+
+    def read_code(self):
+        return self.read_fields(1)[0].decode('utf-8')
+
+    def read_int(self):
+        return int(self.read_fields(1)[0])
+
+    def read_float(self):
+        return float(self.read_fields(1)[0])
+
+    def read_point(self):
+        x, y = self.read_fields(2)
+        return self.transform(float(x), float(y))
+
+    def read_text(self):
+        num, text = self.read_fields(2)
+        num = int(num)
+        # strip the dash preceding the text
+        text = text[1:]
+        if len(text) != num:
+            # the text contains whitespace (or is truncated), so slice it
+            # from the buffer, and split whatever follows it again
+            mo = next(islice(self.field_re.finditer(self.buf), self.index - 1, None))
+            pos = mo.start() + 1
+            text = self.buf[pos:pos + num]
+            self.buf = self.buf[pos + num:]
+            self.fields = self.buf.split()
+            self.index = 0
+        return text.decode('utf-8')
+
+    def read_polygon(self):
+        n = int(self.read_fields(1)[0])
+        points = numpy.array(self.read_fields(2*n), dtype=float).reshape(n, 2)
+        return self.parser.transform_points(points)
+
+    def parse(self):
+        opcodes = self.opcodes
+        while self.index < len(self.fields):
+            op = self.fields[self.index]
+            self.index += 1
+            try:
+                decode = opcodes[op]
+            except KeyError:
+                sys.stderr.write("error: unknown xdot opcode '%s'\n" % op.decode('utf-8'))
+                sys.exit(1)
+            decode(self)
+
+        return self.shapes
+
+    def decode_pen_color(self):
+        color = self.read_color()
+        if color is not None:
+            self.handle_color(color, filled=False)
+
+    def decode_fill_color(self):
+        color = self.read_color()
+        if color is not None:
+            self.handle_color(color, filled=True)
+
+    def decode_style(self):
+        # http://www.graphviz.org/doc/info/attrs.html#k:style
+        style = self.read_text()
+        if style.startswith("setlinewidth("):
+            lw = style.split("(")[1].split(")")[0]
+            lw = float(lw)
+            self.handle_linewidth(lw)
+        elif style in ("solid", "dashed", "dotted"):
+            self.handle_linestyle(style)
+
+    def decode_font(self):
+        size = self.read_float()
+        name = self.read_text()
+        self.handle_font(size, name)
+
+    def decode_text(self):
+        x, y, j, w = self.read_fields(4)
+        x, y = self.transform(float(x), float(y))
+        t = self.read_text()
+        self.handle_text(x, y, int(j), float(w), t)
+
+    def decode_font_characteristics(self):
+        f = self.read_int()
+        self.handle_font_characteristics(f)
+
+    def decode_filled_ellipse(self):
+        x0, y0, w, h = self.read_fields(4)
+        x0, y0 = self.transform(float(x0), float(y0))
+        self.handle_ellipse(x0, y0, float(w), float(h), filled=True)
+
+    def decode_ellipse(self):
+        x0, y0, w, h = self.read_fields(4)
+        x0, y0 = self.transform(float(x0), float(y0))
+        self.handle_ellipse(x0, y0, float(w), float(h), filled=False)
+
+    def decode_line(self):
+        self.handle_line(self.read_polygon())
+
+    def decode_bezier(self):
+        self.handle_bezier(self.read_polygon(), filled=False)
+
+    def decode_filled_bezier(self):
+        self.handle_bezier(self.read_polygon(), filled=True)
+
+    def decode_filled_polygon(self):
+        self.handle_polygon(self.read_polygon(), filled=True)
+
+    def decode_polygon(self):
+        self.handle_polygon(self.read_polygon(), filled=False)
+
+    def decode_image(self):
+        x0, y0 = self.read_point()
+        w = self.read_float()
+        h = self.read_float()
+        path = self.read_text()
+        self.handle_image(x0, y0, w, h, path)
+
+    # opcode dispatch table
+    opcodes = {
+        b'c': decode_pen_color,
+        b'C': decode_fill_color,
+        b'S': decode_style,
+        b'F': decode_font,
+        b'T': decode_text,
+        b't': decode_font_characteristics,
+        b'E': decode_filled_ellipse,
+        b'e': decode_ellipse,
+        b'L': decode_line,
+        b'B': decode_bezier,
+        b'b': decode_filled_bezier,
+        b'P': decode_filled_polygon,
+        b'p': decode_polygon,
+        b'I': decode_image,
+    }
+
+
+class DecodeCache:
+    """Bounded LRU cache of the shapes decoded from drawing attributes, keyed
+    on the raw attribute bytes.
+
+    Cached shapes are shared by all the elements with the same drawing
+    attributes, so they're returned as tuples."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code, decode):
+        """Return the shapes of the given attribute, calling decode(code) to
+        obtain them on a miss."""
+        entries = self.entries
+        try:
+            shapes = entries[code]
+        except KeyError:
+            self.misses += 1
+            shapes = tuple(decode(code))
+            entries[code] = shapes
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        else:
+            self.hits += 1
+            entries.move_to_end(code)
+        return shapes
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        lookups = self.hits + self.misses
+        return '%u hits, %u misses (%.1f%% hit rate), %u cached' % (
+            self.hits, self.misses, 100.0*self.hits/lookups if lookups else 0.0, len(self))
+
+
 class XDotParser(DotParser):
 
     XDOTVERSION = '1.7'
 
-    def __init__(self, xdotcode, graphviz_version=None):
-        lexer = DotLexer(buf=xdotcode)
-        DotParser.__init__(self, lexer)
+    # attributes always needed to lay out the graph, even when keep_attrs
+    # restricts the parsed attributes
+    layout_attrs = ('bb', 'charset', 'height', 'outputorder', 'pos', 'width', 'xdotversion',
+                    'penwidth', 'arrowsize', 'lp', 'xlp', 'head_lp', 'tail_lp', 'fixedsize')
+
+    # decoder of the xdot drawing attributes
+    attr_parser = XDotAttrDecoder
+
+    # drawing attributes, in drawing order
+    draw_attrs = ("_draw_", "_ldraw_", "_hdraw_", "_tdraw_", "_hldraw_", "_tldraw_")
+
+    # maximum number of distinct drawing attributes whose shapes are cached
+    decode_cache_size = 4096
+
+    # color operations, and filled shapes, of drawing attributes
+    color_op_re = re.compile(br'(?:^|\s)([cC]) (\d+) -')
+    filled_op_re = re.compile(br'(?:^|\s)[EPb] ')
+
+    def __init__(self, xdotcode, graphviz_version=None, fp=None, keep_attrs=None, lexer=None, lazy=False):
+        if lexer is not None:
+            pass
+        elif fp is not None:
+            # parse the xdot incrementally, as it is read
+            lexer = DotLexer(fp=fp, stream=True)
+        else:
+            lexer = TokenCursor(DotLexer(buf=xdotcode))
+        if keep_attrs is not None:
+            keep_attrs = set(keep_attrs).union(self.layout_attrs)
+        DotParser.__init__(self, lexer, keep_attrs)
 
         # https://github.com/jrfonseca/xdot.py/issues/92
         self.broken_backslashes = False
@@ -270,6 +468,14 @@ class XDotParser(DotParser):
 
         self.charset = 'utf-8'
 
+        # Whether to defer decoding the drawing attributes of nodes and edges
+        # until they are drawn or hit-tested
+        self.lazy = lazy
+
+        # the shapes of a drawing attribute only depend on its bytes (and on
+        # the transform, which is the same for the whole graph)
+        self.decode_cache = DecodeCache(self.decode_cache_size)
+
         self.nodes = []
         self.edges = []
         self.shapes = []
@@ -317,15 +523,49 @@ class XDotParser(DotParser):
                 self.yscale = -1.0
                 # FIXME: scale from points to pixels
 
+                # same, for transform_points
+                self.offsets = numpy.array((self.xoffset, self.yoffset))
+                self.scales = numpy.array((self.xscale, self.yscale))
+
                 self.width = max(xmax - xmin, 1)
                 self.height = max(ymax - ymin, 1)
 
                 self.top_graph = False
 
-        for attr in ("_draw_", "_ldraw_", "_hdraw_", "_tdraw_", "_hldraw_", "_tldraw_"):
+        self.shapes.extend(self.parse_shapes(attrs, self.draw_attrs))
+
+    def parse_shapes(self, attrs, names):
+        shapes = ()
+        for attr in names:
             if attr in attrs:
-                parser = XDotAttrParser(self, attrs[attr], self.broken_backslashes)
-                self.shapes.extend(parser.parse())
+                shapes += self.decode_cache.get(attrs[attr], self.decode_draw_attr)
+        return shapes
+
+    def decode_draw_attr(self, code):
+        parser = self.attr_parser(self, code, self.broken_backslashes)
+        return parser.parse()
+
+    def parse_simplified_color(self, attrs, fill):
+        """Color of the simplified shape of a node or edge, without decoding
+        its _draw_ attribute: the first fill color if fill is true and there
+        are filled shapes, or else the first pen color."""
+        code = attrs.get('_draw_')
+        if code is None:
+            return None
+        op = b'C' if fill and self.filled_op_re.search(code) else b'c'
+        for mo in self.color_op_re.finditer(code):
+            if mo.group(1) == op:
+                pos = mo.end()
+                return resolve_color(code[pos:pos + int(mo.group(2))].decode('utf-8'))
+        return None
+
+    def lazy_shapes(self, attrs, names):
+        """Return a callable which decodes the shapes of the given drawing
+        attributes, or an empty list if there are none."""
+        draw_attrs = {name: attrs[name] for name in names if name in attrs}
+        if not draw_attrs:
+            return []
+        return lambda: self.parse_shapes(draw_attrs, names)
 
     def decode_attr(self, attrs, name):
         try:
@@ -376,14 +616,19 @@ class XDotParser(DotParser):
         x, y = self.parse_node_pos(pos)
         w = float(attrs.get('width', 0))*72
         h = float(attrs.get('height', 0))*72
-        shapes = []
-        for attr in ("_draw_", "_ldraw_"):
-            if attr in attrs:
-                parser = XDotAttrParser(self, attrs[attr], self.broken_backslashes)
-                shapes.extend(parser.parse())
+        bounding = None
+        if self.lazy and 'xlp' not in attrs and attrs.get('fixedsize', b'false').lower() == b'false':
+            # external labels, and labels of fixed size nodes, may lie
+            # outside of the node box
+            shapes = self.lazy_shapes(attrs, ("_draw_", "_ldraw_"))
+            bt = float(attrs.get('penwidth', 1)) / 2.
+            bounding = x - 0.5*w - bt, y - 0.5*h - bt, x + 0.5*w + bt, y + 0.5*h + bt
+        else:
+            shapes = self.parse_shapes(attrs, ("_draw_", "_ldraw_"))
         url = self.decode_attr(attrs, 'URL')
         tooltip = self.interpret_esc_nl(self.decode_attr(attrs, 'tooltip'))
-        node = elements.Node(id, x, y, w, h, shapes, url, tooltip)
+        color = self.parse_simplified_color(attrs, fill=True)
+        node = elements.Node(id, x, y, w, h, shapes, url, tooltip, bounding, color)
         self.node_by_name[id] = node
         if shapes:
             self.nodes.append(node)
@@ -395,11 +640,19 @@ class XDotParser(DotParser):
             return
 
         points = self.parse_edge_pos(pos)
-        shapes = []
-        for attr in ("_draw_", "_ldraw_", "_hdraw_", "_tdraw_", "_hldraw_", "_tldraw_"):
-            if attr in attrs:
-                parser = XDotAttrParser(self, attrs[attr], self.broken_backslashes)
-                shapes.extend(parser.parse())
+        bounding = None
+        bounds = None
+        if self.lazy and not any(attr in attrs for attr in ('lp', 'xlp', 'head_lp', 'tail_lp')):
+            bounds = self.parse_edge_bounds(pos)
+        if bounds is not None:
+            # the spline lies within its control points, and arrows within
+            # their length of the start/end points
+            shapes = self.lazy_shapes(attrs, self.draw_attrs)
+            x0, y0, x1, y1 = bounds
+            bt = 10. * float(attrs.get('arrowsize', 1)) + float(attrs.get('penwidth', 1))
+            bounding = x0 - bt, y0 - bt, x1 + bt, y1 + bt
+        else:
+            shapes = self.parse_shapes(attrs, self.draw_attrs)
         if shapes:
             src = self.node_by_name[src_id]
             dst = self.node_by_name[dst_id]
@@ -415,10 +668,19 @@ class XDotParser(DotParser):
                 'tail': tail_url or edge_url
             }
 
-            self.edges.append(elements.Edge(src, dst, points, shapes, tooltip, url))
+            color = self.parse_simplified_color(attrs, fill=False)
+            self.edges.append(elements.Edge(src, dst, points, shapes, tooltip, url, bounding, color))
 
     def parse(self):
         DotParser.parse(self)
+        return self.make_graph()
+
+    def make_graph(self):
+        if self.lazy:
+            # only the transform is needed to decode the remaining shapes, so
+            # release the lexer and its buffers
+            self.lexer = None
+            self.lookahead = None
         return elements.Graph(self.width, self.height, self.shapes,
                               self.nodes, self.edges, self.outputorder)
 
@@ -427,20 +689,79 @@ class XDotParser(DotParser):
         return self.transform(float(x), float(y))
 
     def parse_edge_pos(self, pos):
-        points = []
-        for entry in pos.split(b' '):
-            fields = entry.split(b',')
-            try:
-                x, y = fields
-            except ValueError:
-                # TODO: handle start/end points
-                continue
-            else:
-                points.append(self.transform(float(x), float(y)))
-        return points
+        # TODO: handle start/end points, i.e., entries with 3 fields
+        coords = [fields for fields in (entry.split(b',') for entry in pos.split(b' '))
+                  if len(fields) == 2]
+        points = numpy.array(coords, dtype=float).reshape(len(coords), 2)
+        return self.transform_points(points)
+
+    def parse_edge_bounds(self, pos):
+        """Bounds of all points of an edge position, including the start and
+        end points, or None if it has none."""
+        coords = [fields[-2:] for fields in (entry.split(b',') for entry in pos.split(b' '))
+                  if len(fields) >= 2]
+        if not coords:
+            return None
+        points = numpy.array(coords, dtype=float).reshape(len(coords), 2)
+        xs, ys = self.transform_points(points).T.tolist()
+        return min(xs), min(ys), max(xs), max(ys)
 
     def transform(self, x, y):
         # XXX: this is not the right place for this code
         x = (x + self.xoffset)*self.xscale
         y = (y + self.yoffset)*self.yscale
         return x, y
+
+    def transform_points(self, points):
+        """Transform a (n, 2) array of points in place."""
+        points += self.offsets
+        points *= self.scales
+        return points
+
+
+class XDotGraphs:
+    """Sequence of the graphs of an xdot buffer with multiple graphs, which
+    are only parsed when accessed.
+
+    An already parsed first graph can be given, in which case the buffer
+    holds the graphs that follow it.  The most recently accessed graphs are
+    kept, so that going back and forth between them doesn't parse them
+    again."""
+
+    # maximum number of parsed graphs kept
+    cache_size = 4
+
+    def __init__(self, xdotcode, graphviz_version=None, first=None, lazy=False):
+        self.index = GraphIndex(xdotcode)
+        self.graphviz_version = graphviz_version
+        self.first = first
+        self.lazy = lazy
+        self.graphs = collections.OrderedDict()
+
+    def __len__(self):
+        if self.first is None:
+            return len(self.index)
+        else:
+            return len(self.index) + 1
+
+    def __getitem__(self, n):
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError(n)
+        if self.first is not None:
+            if n == 0:
+                return self.first
+            n -= 1
+        graphs = self.graphs
+        try:
+            graph = graphs[n]
+        except KeyError:
+            parser = XDotParser(None, self.graphviz_version, lexer=self.index.lexer(n), lazy=self.lazy)
+            graph = parser.parse()
+            graphs[n] = graph
+            if len(graphs) > self.cache_size:
+                graphs.popitem(last=False)
+        else:
+            graphs.move_to_end(n)
+        return graph
@@ -113,25 +113,64 @@ class TooltipContext():
         TooltipContext._tooltip_window.move(pointer.x + 15, pointer.y + 10)
 
 class NullAction(DragAction):
+    """Hover over the graph, highlighting whatever is under the pointer.
+
+    Motion events are coalesced, so that the graph is hit-tested at most
+    once per frame, and the last result is reused for as long as the pointer
+    stays within the region where it's known not to change."""
+
+    def __init__(self, dot_widget):
+        DragAction.__init__(self, dot_widget)
+        self.pointer = None
+        self.tick_id = None
+        self.region = None
+        self.picked = None
+        self.hovered = None
+
     def on_motion_notify(self, event):
         if event.is_hint:
             window, x, y, state = event.window.get_device_position(event.device)
         else:
             x, y, state = event.x, event.y, event.state
+        self.pointer = x, y, event.copy()
+        if self.tick_id is None:
+            self.tick_id = self.dot_widget.add_tick_callback(self.on_tick)
+
+    def on_tick(self, widget, frame_clock):
+        self.tick_id = None
+        if widget.drag_action is self:
+            x, y, event = self.pointer
+            self.hover(x, y, event)
+        return False
+
+    def hover(self, x, y, event):
         dot_widget = self.dot_widget
-
-        item = dot_widget.get_url(x, y) or dot_widget.get_jump(x, y)
-
-        TooltipContext.reset()
-        TooltipContext.set_parent(dot_widget)
-        if item is not None:
-            dot_widget.get_window().set_cursor(Gdk.Cursor(Gdk.CursorType.HAND2))
-            dot_widget.set_highlight(item.highlight)
-
-            dot_widget.on_hover(dot_widget.get_element(x, y), event, TooltipContext)
-        else:
-            dot_widget.get_window().set_cursor(None)
-            dot_widget.set_highlight(None)
+        graph = dot_widget.graph
+        radius = dot_widget.hit_radius
+        graph_x, graph_y = dot_widget.window2graph(x, y)
+
+        if self.region is None or not self.region.contains(graph, graph_x, graph_y, radius):
+            self.picked = graph.pick(graph_x, graph_y, radius)
+            element = self.picked[0]
+            self.region = graph.pick_region(graph_x, graph_y, radius, element)
+
+        element, url, jump = self.picked
+        item = url or jump
+        if item is None:
+            element = None
+
+        if element is not self.hovered:
+            self.hovered = element
+            TooltipContext.reset()
+            TooltipContext.set_parent(dot_widget)
+            if item is not None:
+                dot_widget.get_window().set_cursor(Gdk.Cursor(Gdk.CursorType.HAND2))
+                dot_widget.on_hover(element, event, TooltipContext)
+            else:
+                dot_widget.get_window().set_cursor(None)
+
+        # the highlight may have been changed by something else meanwhile
+        dot_widget.set_highlight(item.highlight if item is not None else None)
 
 
 class PanAction(DragAction):
@@ -142,7 +181,7 @@ class PanAction(DragAction):
     def drag(self, deltax, deltay):
         self.dot_widget.x += deltax / self.dot_widget.zoom_ratio
         self.dot_widget.y += deltay / self.dot_widget.zoom_ratio
-        self.dot_widget.queue_draw()
+        self.dot_widget.queue_interactive_draw()
 
     def stop(self):
         self.dot_widget.get_window().set_cursor(None)
@@ -155,7 +194,7 @@ class ZoomAction(DragAction):
     def drag(self, deltax, deltay):
         self.dot_widget.zoom_ratio *= 1.005 ** (deltax + deltay)
         self.dot_widget.zoom_to_fit_on_resize = False
-        self.dot_widget.queue_draw()
+        self.dot_widget.queue_interactive_draw()
 
     def stop(self):
         self.dot_widget.queue_draw()
@@ -94,7 +94,7 @@ class MoveToAnimation(LinearAnimation):
         tx, ty = self.target_x, self.target_y
         self.dot_widget.x = tx * t + sx * (1 - t)
         self.dot_widget.y = ty * t + sy * (1 - t)
-        self.dot_widget.queue_draw()
+        self.dot_widget.queue_interactive_draw()
 
 
 class ZoomToAnimation(MoveToAnimation):
@@ -30,10 +30,18 @@ from gi.repository import PangoCairo
 import cairo
 import numpy
 
+from .pen import Pen
+from .spatial import GridIndex
+
 _inf = float('inf')
 _get_bounding = operator.attrgetter('bounding')
 
 
+def _get_device_scale(cr):
+    """Size of a unit of user space, in device pixels."""
+    return math.hypot(*cr.user_to_device_distance(1.0, 0.0))
+
+
 class Shape:
     """Abstract base class for all the drawing shapes."""
     bounding = (-_inf, -_inf, _inf, _inf)
@@ -51,6 +59,11 @@ class Shape:
         x2, y2, x3, y3 = self.bounding
         return x0 <= x2 and x3 <= x1 and y0 <= y2 and y3 <= y1
 
+    def is_near(self, x, y, radius):
+        """Cheaply rule out points farther than radius from the shape."""
+        x1, y1, x2, y2 = self.bounding
+        return (x1 - radius) <= x and x <= (x2 + radius) and (y1 - radius) <= y and y <= (y2 + radius)
+
     def _draw(self, cr, highlight, bounding):
         """Actual draw implementation"""
         raise NotImplementedError
@@ -62,9 +75,7 @@ class Shape:
 
     def select_pen(self, highlight):
         if highlight:
-            if not hasattr(self, 'highlight_pen'):
-                self.highlight_pen = self.pen.highlighted()
-            return self.highlight_pen
+            return self.pen.highlighted()
         else:
             return self.pen
 
@@ -74,15 +85,22 @@ class Shape:
     def get_smallest_distance(self, x, y):
         return None
 
+    def get_hit_boxes(self, radius):
+        """Boxes outside of which get_smallest_distance exceeds radius.  Empty
+        if that never returns a distance."""
+        return []
+
+    @staticmethod
+    def _as_points(points):
+        """Convert a sequence of (x, y) pairs into a (n, 2) array."""
+        return numpy.asarray(points, dtype=float).reshape(-1, 2)
+
     @staticmethod
     def _bounds_from_points(points):
-        x0, y0 = points[0]
-        x1, y1 = x0, y0
-        for i in range(1, len(points)):
-            x, y = points[i]
-            x0, x1 = min(x0, x), max(x1, x)
-            y0, y1 = min(y0, y), max(y1, y)
-        return x0, y0, x1, y1
+        # numpy reductions have too much overhead for the few points of
+        # most shapes
+        xs, ys = points.T.tolist()
+        return min(xs), min(ys), max(xs), max(ys)
 
     @staticmethod
     def _envelope_bounds(*args):
@@ -147,21 +165,75 @@ fontname_map = {
 }
 
 
+# line heights of fonts, by name and size
+_line_heights = {}
+
+
 class TextShape(Shape):
 
     LEFT, CENTER, RIGHT = -1, 0, 1
 
+    # XXX get descender from font metrics
+    descent = 2
+
+    # line height, relative to the font size, assumed when the font can't be
+    # measured, and at least assumed otherwise, as characters missing from
+    # the font may come from fallback fonts with taller lines
+    line_height = 1.5
+
+    # text with a smaller font size on screen, in pixels, is drawn as a box
+    min_pixels = 4
+
     def __init__(self, pen, x, y, j, w, t):
         Shape.__init__(self)
-        self.pen = pen.copy()
+        self.pen = pen
         self.x = x
         self.y = y
         self.j = j  # Centering
         self.w = w  # width
         self.t = t  # text
 
+        # the text is scaled down to fit the width dot gave it, if needed,
+        # and placed over the baseline, as done in _draw
+        height = self._get_line_height(pen.fontname, pen.fontsize)
+        self.bounding = (x - 0.5 * (1 + j) * w, y - height,
+                         x + 0.5 * (1 - j) * w, y + self.descent)
+
+    @classmethod
+    def _get_line_height(cls, fontname, fontsize):
+        key = fontname, fontsize
+        try:
+            return _line_heights[key]
+        except KeyError:
+            pass
+
+        height = cls.line_height * fontsize
+        try:
+            context = PangoCairo.FontMap.get_default().create_context()
+            font = Pango.FontDescription(fontname_map.get(fontname, fontname))
+            font.set_absolute_size(fontsize*Pango.SCALE)
+            metrics = context.get_metrics(font, None)
+            measured = float(metrics.get_ascent() + metrics.get_descent())/Pango.SCALE
+        except Exception:
+            # fonts can't always be measured, e.g., without a font map
+            pass
+        else:
+            height = max(height, measured)
+
+        _line_heights[key] = height
+        return height
+
     def _draw(self, cr, highlight, bounding):
 
+        if self.pen.fontsize*_get_device_scale(cr) < self.min_pixels:
+            # too small to read, so don't bother laying it out
+            x0, y0, x1, y1 = self.bounding
+            r, g, b, a = self.select_pen(highlight).color
+            cr.set_source_rgba(r, g, b, 0.25*a)
+            cr.rectangle(x0, self.y - 0.5*self.pen.fontsize, x1 - x0, 0.5*self.pen.fontsize)
+            cr.fill()
+            return
+
         try:
             layout = self.layout
         except AttributeError:
@@ -219,7 +291,7 @@ class TextShape(Shape):
         else:
             PangoCairo.update_layout(cr, layout)
 
-        descent = 2  # XXX get descender from font metrics
+        descent = self.descent
 
         width, height = layout.get_size()
         width = float(width)/Pango.SCALE
@@ -259,11 +331,6 @@ class TextShape(Shape):
     def search_text(self, regexp):
         return regexp.search(self.t) is not None
 
-    @property
-    def bounding(self):
-        x, w, j = self.x, self.w, self.j
-        return x - 0.5 * (1 + j) * w, -_inf, x + 0.5 * (1 - j) * w, _inf
-
     def get_text(self):
         return self.t
 
@@ -272,7 +339,7 @@ class ImageShape(Shape):
 
     def __init__(self, pen, x0, y0, w, h, path):
         Shape.__init__(self)
-        self.pen = pen.copy()
+        self.pen = pen
         self.x0 = x0
         self.y0 = y0
         self.w = w
@@ -300,7 +367,7 @@ class EllipseShape(Shape):
 
     def __init__(self, pen, x0, y0, w, h, filled=False):
         Shape.__init__(self)
-        self.pen = pen.copy()
+        self.pen = pen
         self.x0 = x0
         self.y0 = y0
         self.w = w
@@ -336,8 +403,8 @@ class PolygonShape(Shape):
 
     def __init__(self, pen, points, filled=False):
         Shape.__init__(self)
-        self.pen = pen.copy()
-        self.points = points
+        self.pen = pen
+        self.points = Shape._as_points(points)
         self.filled = filled
 
         x0, y0, x1, y1 = Shape._bounds_from_points(self.points)
@@ -345,9 +412,10 @@ class PolygonShape(Shape):
         self.bounding = x0 - bt, y0 - bt, x1 + bt, y1 + bt
 
     def _draw(self, cr, highlight, bounding):
-        x0, y0 = self.points[-1]
+        points = self.points.tolist()
+        x0, y0 = points[-1]
         cr.move_to(x0, y0)
-        for x, y in self.points:
+        for x, y in points:
             cr.line_to(x, y)
         cr.close_path()
         pen = self.select_pen(highlight)
@@ -366,17 +434,18 @@ class LineShape(Shape):
 
     def __init__(self, pen, points):
         Shape.__init__(self)
-        self.pen = pen.copy()
-        self.points = points
+        self.pen = pen
+        self.points = Shape._as_points(points)
 
         x0, y0, x1, y1 = Shape._bounds_from_points(self.points)
         bt = self.pen.linewidth / 2.
         self.bounding = x0 - bt, y0 - bt, x1 + bt, y1 + bt
 
     def _draw(self, cr, highlight, bounding):
-        x0, y0 = self.points[0]
+        points = self.points.tolist()
+        x0, y0 = points[0]
         cr.move_to(x0, y0)
-        for x1, y1 in self.points[1:]:
+        for x1, y1 in points[1:]:
             cr.line_to(x1, y1)
         pen = self.select_pen(highlight)
         cr.set_dash(pen.dash)
@@ -389,29 +458,71 @@ class BezierShape(Shape):
 
     def __init__(self, pen, points, filled=False):
         Shape.__init__(self)
-        self.pen = pen.copy()
-        self.points = points
+        self.pen = pen
+        self.points = Shape._as_points(points)
         self.filled = filled
 
-        x0, y0 = self.points[0]
+        if len(self.points) > self.vectorize_threshold:
+            xa, ya, xb, yb = self._bezier_bounds(self.points)
+        else:
+            xa, ya, xb, yb = self._bezier_bounds_scalar(self.points)
+
+        bt = 0 if self.filled else self.pen.linewidth / 2.
+        self.bounding = xa - bt, ya - bt, xb + bt, yb + bt
+
+    # number of points above which the bounds are computed with numpy, whose
+    # overhead outweighs its benefits for the few segments of most edges
+    vectorize_threshold = 48
+
+    @classmethod
+    def _bezier_bounds_scalar(cls, points):
+        points = points.tolist()
+        x0, y0 = points[0]
         xa = xb = x0
         ya = yb = y0
-        for i in range(1, len(self.points), 3):
-            (x1, y1), (x2, y2), (x3, y3) = self.points[i:i+3]
-            for t in self._cubic_bernstein_extrema(x0, x1, x2, x3):
+        for i in range(1, len(points), 3):
+            (x1, y1), (x2, y2), (x3, y3) = points[i:i+3]
+            for t in cls._cubic_bernstein_extrema(x0, x1, x2, x3):
                 if 0 < t < 1:  # We're dealing only with Bezier curves
-                    v = self._cubic_bernstein(x0, x1, x2, x3, t)
+                    v = cls._cubic_bernstein(x0, x1, x2, x3, t)
                     xa, xb = min(xa, v), max(xb, v)
             xa, xb = min(xa, x3), max(xb, x3)  # t=0 / t=1
-            for t in self._cubic_bernstein_extrema(y0, y1, y2, y3):
+            for t in cls._cubic_bernstein_extrema(y0, y1, y2, y3):
                 if 0 < t < 1:  # We're dealing only with Bezier curves
-                    v = self._cubic_bernstein(y0, y1, y2, y3, t)
+                    v = cls._cubic_bernstein(y0, y1, y2, y3, t)
                     ya, yb = min(ya, v), max(yb, v)
             ya, yb = min(ya, y3), max(yb, y3)  # t=0 / t=1
             x0, y0 = x3, y3
+        return xa, ya, xb, yb
 
-        bt = 0 if self.filled else self.pen.linewidth / 2.
-        self.bounding = xa - bt, ya - bt, xb + bt, yb + bt
+    @staticmethod
+    def _bezier_bounds(points):
+        """Same as _bezier_bounds_scalar, but for all segments and both axes
+        at once."""
+        n = (len(points) - 1) // 3
+        ends = points[0:3*n + 1:3]
+        p0, p1, p2, p3 = ends[:-1], points[1:3*n:3], points[2:3*n:3], ends[1:]
+
+        # extrema, as in _cubic_bernstein_extrema, where no or infinite
+        # solutions become NaN or infinity, and are discarded below
+        a = 3.*(p3-p0+3.*(p1-p2))
+        b = 6.*(p0+p2-2.*p1)
+        c = 3.*(p1-p0)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            r = numpy.sqrt(b*b - 4.*a*c)
+            k = -2. * a
+            quadratic = a != 0
+            t = numpy.stack((numpy.where(quadratic, (b + r) / k, -c / b),
+                             numpy.where(quadratic, (b - r) / k, numpy.nan)))
+
+        # We're dealing only with Bezier curves, and t=0 evaluates to p0
+        t = numpy.where((0 < t) & (t < 1), t, 0.)
+        u = 1 - t
+        v = p0*(u**3) + 3*t*u*(p1*u + p2*t) + p3*(t**3)
+
+        xa, ya = numpy.minimum(ends.min(axis=0), v.min(axis=(0, 1), initial=_inf)).tolist()
+        xb, yb = numpy.maximum(ends.max(axis=0), v.max(axis=(0, 1), initial=-_inf)).tolist()
+        return xa, ya, xb, yb
 
     @staticmethod
     def _cubic_bernstein_extrema(p0, p1, p2, p3):
@@ -452,10 +563,11 @@ class BezierShape(Shape):
         return p0*(u**3) + 3*t*u*(p1*u + p2*t) + p3*(t**3)
 
     def _draw(self, cr, highlight, bounding):
-        x0, y0 = self.points[0]
+        points = self.points.tolist()
+        x0, y0 = points[0]
         cr.move_to(x0, y0)
-        for i in range(1, len(self.points), 3):
-            (x1, y1), (x2, y2), (x3, y3) = self.points[i:i+3]
+        for i in range(1, len(points), 3):
+            (x1, y1), (x2, y2), (x3, y3) = points[i:i+3]
             cr.curve_to(x1, y1, x2, y2, x3, y3)
         pen = self.select_pen(highlight)
         if self.filled:
@@ -468,66 +580,134 @@ class BezierShape(Shape):
             cr.set_source_rgba(*pen.color)
             cr.stroke()
 
-    def get_smallest_distance(self, x, y):
-        min_squared_distance = float('inf')
+    def get_hit_boxes(self, radius):
+        # each segment lies within the hull of its control points
+        points = self.points.tolist()
+        boxes = []
+        for i in range(0, len(points) - 3, 3):
+            xs, ys = zip(*points[i:i + 4])
+            boxes.append((min(xs) - radius, min(ys) - radius, max(xs) + radius, max(ys) + radius))
+        return boxes
 
-        points_iter = iter(self.points)
-        x0, y0 = next(points_iter)
+    # maximum distance between a curve and the polyline approximating it
+    flatness = 0.05
 
-        while True:
-            try:
-                x1, y1 = next(points_iter)
+    # maximum number of lines each segment is approximated with
+    max_flattening_steps = 256
 
-            except StopIteration:
-                break
+    def _get_flattened(self):
+        """Approximate the curve with a polyline, within flatness.
 
-            x2, y2 = next(points_iter)
-            x3, y3 = next(points_iter)
-
-            _e1 = -5
-            _e2 = (x0 - 3 * x1 + 3 * x2 - x3)
-            _e3 = (y0 - 3 * y1 + 3 * y2 - y3)
-            _e4 = 2 * x1
-            _e5 = 2 * y1
-            _e6 = x0**2
-            _e7 = y0**2
-            _e8 = -2
-            _e9 = (x0 - _e4 + x2)
-            _e10 = (y0 - _e5 + y2)
-            _e11 = 2 * x0
-            _e12 = 2 * y0
-            _e13 = 5 * _e6
-            _e14 = 5 * _e7
-            _e15 = x1**2
-            _e16 = y1**2
-            coefficients = [
-                (x - x0) * (x0 - x1) + (y - y0) * (y0 - y1),
-                _e13 + 3 * _e15 + _e11 * (_e1 * x1 + x2) - 2 * x * _e9 + _e14 + 3 * _e16 + _e12 * (_e1 * y1 + y2) - 2 * y * _e10,
-                -10 * _e6 + 9 * x1 * (_e8 * x1 + x2) + x * _e2 + x0 * (30 * x1 - 12 * x2 + x3) - 10 * _e7 + 9 * y1 * (_e8 * y1 + y2) + y * _e3 + y0 * (30 * y1 - 12 * y2 + y3),
-                2 * (_e13 + 18 * _e15 + 3 * x2**2 + _e4 * (-9 * x2 + x3) - _e11 * (10 * x1 - 6 * x2 + x3) + _e14 + 3 * (6 * _e16 - 6 * y1 * y2 + y2**2) + _e5 * y3 - _e12 * (10 * y1 - 6 * y2 + y3)),
-                _e1 * _e9 * _e2 - 5 * _e10 * _e3,
-                _e2**2 + _e3**2
-            ]
-            coefficients.reverse()
-
-            for t in numpy.roots(coefficients):
-                if 1e-6 < abs(t.imag):
-                    continue
-
-                t = t.real
-                if t < 0:
-                    t = 0
-                elif 1 < t:
-                    t = 1
-
-                squared_distance = ((1 - t)**3 * x0 + 3 * (1 - t)**2 * t * x1 + 3 * (1 - t) * t**2 * x2 + t**3 * x3 - x)**2 + ((1 - t)**3 * y0 + 3 * (1 - t)**2 * t * y1 + 3 * (1 - t) * t**2 * y2 + t**3 * y3 - y)**2
-                if squared_distance < min_squared_distance:
-                    min_squared_distance = squared_distance
-
-            x0 = x3
-            y0 = y3
-
-        return math.sqrt(min_squared_distance)
+        Returns the start and the extent of every line of the polyline, the
+        reciprocal of their squared lengths (or zero), and which segment each
+        of them belongs to.  These are computed on first use, and kept."""
+        try:
+            return self._flattened
+        except AttributeError:
+            pass
+
+        points = self.points
+        n = (len(points) - 1) // 3
+        ends = points[0:3*n + 1:3]
+        p0, p1, p2, p3 = ends[:-1], points[1:3*n:3], points[2:3*n:3], ends[1:]
+
+        # Sampling a cubic at steps of h deviates from it by at most h**2/8
+        # times the magnitude of its second derivative, itself at most six
+        # times the largest second difference of the control points.
+        second = numpy.maximum(numpy.hypot(*(p0 - 2*p1 + p2).T), numpy.hypot(*(p1 - 2*p2 + p3).T))
+        steps = numpy.ceil(numpy.sqrt(0.75*second/self.flatness))
+        steps = numpy.clip(steps, 1, self.max_flattening_steps).astype(int)
+
+        segments = numpy.repeat(numpy.arange(n), steps)
+        first = numpy.cumsum(steps) - steps
+        t = ((numpy.arange(len(segments)) - first[segments]) / steps[segments])[:, numpy.newaxis]
+        u = 1 - t
+        p0, p1, p2, p3 = p0[segments], p1[segments], p2[segments], p3[segments]
+        vertices = p0*(u**3) + 3*t*u*(p1*u + p2*t) + p3*(t**3)
+        vertices = numpy.concatenate((vertices, ends[-1:]))
+
+        x, y = vertices.T
+        dx = numpy.diff(x)
+        dy = numpy.diff(y)
+        dd = dx*dx + dy*dy
+        with numpy.errstate(divide='ignore'):
+            rdd = numpy.where(dd > 0, 1/dd, 0)
+
+        self._flattened = x[:-1].copy(), y[:-1].copy(), dx, dy, rdd, segments
+        return self._flattened
+
+    def get_smallest_distance(self, x, y, exact=False):
+        """Distance from the point to the curve, within flatness.
+
+        When exact is true, the distance is refined by solving for the
+        closest point of the segments which might hold it."""
+        x0, y0, dx, dy, rdd, segments = self._get_flattened()
+        if not len(segments):
+            return _inf
+        wx = x - x0
+        wy = y - y0
+        t = (wx*dx + wy*dy)*rdd
+        numpy.clip(t, 0, 1, out=t)
+        wx -= t*dx
+        wy -= t*dy
+        squared_distances = wx*wx + wy*wy
+        min_distance = math.sqrt(squared_distances.min())
+        if not exact:
+            return min_distance
+
+        # the closest segment's lines are within flatness of the curve
+        bound = min_distance + 2*self.flatness
+        candidates = set(segments[squared_distances <= bound*bound].tolist())
+        return math.sqrt(min(self._segment_squared_distance(x, y, i) for i in candidates))
+
+    def _segment_squared_distance(self, x, y, i):
+        """Squared distance from the point to the i-th cubic segment, by
+        finding the roots of the derivative of the squared distance."""
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = self.points[3*i:3*i + 4].tolist()
+
+        _e1 = -5
+        _e2 = (x0 - 3 * x1 + 3 * x2 - x3)
+        _e3 = (y0 - 3 * y1 + 3 * y2 - y3)
+        _e4 = 2 * x1
+        _e5 = 2 * y1
+        _e6 = x0**2
+        _e7 = y0**2
+        _e8 = -2
+        _e9 = (x0 - _e4 + x2)
+        _e10 = (y0 - _e5 + y2)
+        _e11 = 2 * x0
+        _e12 = 2 * y0
+        _e13 = 5 * _e6
+        _e14 = 5 * _e7
+        _e15 = x1**2
+        _e16 = y1**2
+        coefficients = [
+            (x - x0) * (x0 - x1) + (y - y0) * (y0 - y1),
+            _e13 + 3 * _e15 + _e11 * (_e1 * x1 + x2) - 2 * x * _e9 + _e14 + 3 * _e16 + _e12 * (_e1 * y1 + y2) - 2 * y * _e10,
+            -10 * _e6 + 9 * x1 * (_e8 * x1 + x2) + x * _e2 + x0 * (30 * x1 - 12 * x2 + x3) - 10 * _e7 + 9 * y1 * (_e8 * y1 + y2) + y * _e3 + y0 * (30 * y1 - 12 * y2 + y3),
+            2 * (_e13 + 18 * _e15 + 3 * x2**2 + _e4 * (-9 * x2 + x3) - _e11 * (10 * x1 - 6 * x2 + x3) + _e14 + 3 * (6 * _e16 - 6 * y1 * y2 + y2**2) + _e5 * y3 - _e12 * (10 * y1 - 6 * y2 + y3)),
+            _e1 * _e9 * _e2 - 5 * _e10 * _e3,
+            _e2**2 + _e3**2
+        ]
+        coefficients.reverse()
+
+        # the ends too, as the closest point needn't be a stationary one
+        min_squared_distance = min((x0 - x)**2 + (y0 - y)**2, (x3 - x)**2 + (y3 - y)**2)
+        for t in numpy.roots(coefficients):
+            if 1e-6 < abs(t.imag):
+                continue
+
+            t = t.real
+            if t < 0:
+                t = 0
+            elif 1 < t:
+                t = 1
+
+            squared_distance = ((1 - t)**3 * x0 + 3 * (1 - t)**2 * t * x1 + 3 * (1 - t) * t**2 * x2 + t**3 * x3 - x)**2 + ((1 - t)**3 * y0 + 3 * (1 - t)**2 * t * y1 + 3 * (1 - t) * t**2 * y2 + t**3 * y3 - y)**2
+            if squared_distance < min_squared_distance:
+                min_squared_distance = squared_distance
+
+        return min_squared_distance
 
 
 class CompoundShape(Shape):
@@ -579,11 +759,56 @@ class Jump(object):
         self.highlight = highlight
 
 
+class PickRegion(object):
+    """Area around a picked point where Graph.pick is known to give the same
+    result: a bounding box, minus the boxes of any elements within it."""
+
+    def __init__(self, graph, radius, bounding, holes):
+        self.graph = graph
+        self.radius = radius
+        self.bounding = bounding
+        self.holes = holes
+
+    def contains(self, graph, x, y, radius):
+        if graph is not self.graph or radius != self.radius:
+            return False
+        x1, y1, x2, y2 = self.bounding
+        if not (x1 <= x and x <= x2 and y1 <= y and y <= y2):
+            return False
+        for x1, y1, x2, y2 in self.holes:
+            if x1 <= x and x <= x2 and y1 <= y and y <= y2:
+                return False
+        return True
+
+
 class Element(CompoundShape):
-    """Base class for graph nodes and edges."""
+    """Base class for graph nodes and edges.
 
-    def __init__(self, shapes):
-        CompoundShape.__init__(self, shapes)
+    The shapes may also be given as a callable which decodes them, in which
+    case that only happens when they're first needed, and until then the
+    element is bounded by the given bounding box.
+
+    The simplified color is the one its simplified shape is drawn with, when
+    too small to make out, or None for the default pen color."""
+
+    def __init__(self, shapes, bounding=None, simplified_color=None):
+        if callable(shapes):
+            Shape.__init__(self)
+            self.decode_shapes = shapes
+            self.bounding = bounding
+        else:
+            CompoundShape.__init__(self, shapes)
+        self.simplified_color = simplified_color
+
+    def __getattr__(self, name):
+        # only reached while the shapes haven't been decoded
+        if name == 'shapes' and 'decode_shapes' in self.__dict__:
+            shapes = self.decode_shapes()
+            del self.decode_shapes
+            self.shapes = shapes
+            self.bounding = Shape._envelope_bounds(map(_get_bounding, shapes))
+            return shapes
+        raise AttributeError(name)
 
     def is_inside(self, x, y, radius):
         return False
@@ -594,11 +819,15 @@ class Element(CompoundShape):
     def get_jump(self, x, y, radius):
         return None
 
+    def pick(self, x, y, radius, to_dst=False):
+        """Whether the point is inside, and the Url and Jump there, at once."""
+        return False, None, None
+
 
 class Node(Element):
 
-    def __init__(self, id, x, y, w, h, shapes, url, tooltip):
-        Element.__init__(self, shapes)
+    def __init__(self, id, x, y, w, h, shapes, url, tooltip, bounding=None, simplified_color=None):
+        Element.__init__(self, shapes, bounding, simplified_color)
 
         self.id = id
         self.x = x
@@ -627,6 +856,16 @@ class Node(Element):
             return Jump(self, self.x, self.y)
         return None
 
+    def _draw_box(self, cr):
+        """Add the node box to the path, as a simplified shape."""
+        cr.rectangle(self.x1, self.y1, self.x2 - self.x1, self.y2 - self.y1)
+
+    def pick(self, x, y, radius, to_dst=False):
+        if not self.is_inside(x, y, radius):
+            return False, None, None
+        url = Url(self, self.url) if self.url is not None else None
+        return True, url, Jump(self, self.x, self.y)
+
     def __repr__(self):
         return "<Node %s>" % self.id
 
@@ -639,48 +878,56 @@ def square_distance(x1, y1, x2, y2):
 
 class Edge(Element):
 
-    def __init__(self, src, dst, points, shapes, tooltip, url):
-        Element.__init__(self, shapes)
+    def __init__(self, src, dst, points, shapes, tooltip, url, bounding=None, simplified_color=None):
+        Element.__init__(self, shapes, bounding, simplified_color)
         self.src = src
         self.dst = dst
-        self.points = points
+        self.points = Shape._as_points(points)
         self.tooltip = tooltip
         self.url = url
 
+    def _draw_polyline(self, cr):
+        """Add a polyline through the ends of the spline segments to the
+        path, as a simplified shape."""
+        points = self.points.tolist()
+        x, y = points[0]
+        cr.move_to(x, y)
+        for x, y in points[3::3]:
+            cr.line_to(x, y)
+        if (len(points) - 1) % 3:
+            x, y = points[-1]
+            cr.line_to(x, y)
+
     def is_inside_begin(self, x, y, radius):
         return square_distance(x, y, *self.points[0]) <= radius*radius
 
     def is_inside_end(self, x, y, radius):
         return square_distance(x, y, *self.points[-1]) <= radius*radius
 
-    def is_inside(self, x, y, radius):
-        if self.is_inside_begin(x, y, radius):
-            return True
-        if self.is_inside_end(x, y, radius):
-            return True
+    def is_inside_body(self, x, y, radius):
+        if not self.is_near(x, y, radius):
+            return False
 
         for shape in self.shapes:
+            if not shape.is_near(x, y, radius):
+                continue
             min_dist = shape.get_smallest_distance(x, y)
             if min_dist is not None and min_dist <= radius:
                 return True
 
         return False
 
-    def get_jump(self, x, y, radius, to_dst = False):
-        for shape in self.shapes:
-            x1, y1, x2, y2 = shape.bounding
-            if (x1 - radius) <= x and x <= (x2 + radius) and (y1 - radius) <= y and y <= (y2 + radius):
-                break
-
-        else:
-            return None
-
-        for shape in self.shapes:
-            distance = shape.get_smallest_distance(x, y)
-            if distance is not None and distance <= radius:
-                jmp_dest = self.dst if to_dst else self.src
-                return Jump(self, jmp_dest.x, jmp_dest.y)
+    def is_inside(self, x, y, radius):
+        if self.is_inside_begin(x, y, radius):
+            return True
+        if self.is_inside_end(x, y, radius):
+            return True
+        return self.is_inside_body(x, y, radius)
 
+    def get_jump(self, x, y, radius, to_dst = False):
+        if self.is_inside_body(x, y, radius):
+            jmp_dest = self.dst if to_dst else self.src
+            return Jump(self, jmp_dest.x, jmp_dest.y)
         return None
 
     def get_url(self, x, y, radius):
@@ -692,12 +939,60 @@ class Edge(Element):
             return Url(self, self.url['body'])
         return None
 
+    def pick(self, x, y, radius, to_dst=False):
+        begin = self.is_inside_begin(x, y, radius)
+        end = self.is_inside_end(x, y, radius)
+        # the curves are the only costly part, so test them just once
+        body = self.is_inside_body(x, y, radius)
+
+        if begin and self.url['head'] is not None:
+            url = Url(self, self.url['head'])
+        elif end and self.url['tail'] is not None:
+            url = Url(self, self.url['tail'])
+        elif (begin or end or body) and self.url['body'] is not None:
+            url = Url(self, self.url['body'])
+        else:
+            url = None
+
+        if body:
+            jmp_dest = self.dst if to_dst else self.src
+            jump = Jump(self, jmp_dest.x, jmp_dest.y)
+        else:
+            jump = None
+
+        return begin or end or body, url, jump
+
     def __repr__(self):
         return "<Edge %s -> %s>" % (self.src, self.dst)
 
+    def get_hit_bounding(self):
+        """Box beyond which no point can hit this edge, with no radius."""
+        x1, y1, x2, y2 = self.bounding
+        (bx, by), (ex, ey) = self.points[0].tolist(), self.points[-1].tolist()
+        return min(x1, bx, ex), min(y1, by, ey), max(x2, bx, ex), max(y2, by, ey)
+
+    def get_hit_boxes(self, radius):
+        """Boxes outside of which no point can hit this edge."""
+        boxes = []
+        for x, y in (self.points[0].tolist(), self.points[-1].tolist()):
+            boxes.append((x - radius, y - radius, x + radius, y + radius))
+        for shape in self.shapes:
+            boxes.extend(shape.get_hit_boxes(radius))
+        return boxes
+
 
 class Graph(Shape):
 
+    # nodes smaller than this on screen, in pixels, are drawn as boxes
+    node_lod_pixels = 8
+
+    # edges are drawn as polylines, without arrows, labels, or dashes, when
+    # arrows are smaller than this on screen, in pixels
+    edge_lod_pixels = 3
+
+    # length of arrows, at arrowsize 1
+    arrow_length = 10
+
     def __init__(self, width=1, height=1, shapes=(), nodes=(), edges=(), outputorder='breadthfirst'):
         Shape.__init__(self)
 
@@ -713,83 +1008,270 @@ class Graph(Shape):
             map(_get_bounding, self.nodes),
             map(_get_bounding, self.edges))
 
+        # spatial indices, to find what to draw without testing everything
+        self.shapes_index = GridIndex(self.shapes, map(_get_bounding, self.shapes))
+        self.nodes_index = GridIndex(self.nodes, map(_get_bounding, self.nodes))
+        self.edges_index = GridIndex(self.edges, map(_get_bounding, self.edges))
+
+        # spatial indices for hit testing, built when first needed
+        self._nodes_hit_index = None
+        self._edges_hit_index = None
+
+        # edges incident to each node
+        self.node_edges = {node: [] for node in self.nodes}
+        for edge in self.edges:
+            self.node_edges.setdefault(edge.src, []).append(edge)
+            if edge.dst is not edge.src:
+                self.node_edges.setdefault(edge.dst, []).append(edge)
+
+        # last highlight items, and all they highlight
+        self._highlight = None, frozenset()
+
     def get_size(self):
         return self.width, self.height
 
-    def _draw_shapes(self, cr, bounding, highlight_items):
-        for shape in self.shapes:
-            if bounding is None or shape._intersects(bounding):
-                shape._draw(cr, highlight=(shape in highlight_items), bounding=bounding)
-
-    def _draw_nodes(self, cr, bounding, highlight_items):
-        highlight_nodes = []
-        for element in highlight_items:
-            if isinstance(element, Edge):
-                highlight_nodes.append(element.src)
-                highlight_nodes.append(element.dst)
-            else:
-                highlight_nodes.append(element)
-
-        for node in self.nodes:
-            if bounding is None or node._intersects(bounding):
-                node._draw(cr, highlight=(node in highlight_nodes), bounding=bounding)
+    @staticmethod
+    def _visible(items, index, bounding):
+        if bounding is None:
+            return items
+        return index.query(*bounding)
 
-    def _draw_edges(self, cr, bounding, highlight_items):
-        for edge in self.edges:
-            if bounding is None or edge._intersects(bounding):
-                should_highlight = any(e in highlight_items
-                                       for e in (edge, edge.src, edge.dst))
-                edge._draw(cr, highlight=should_highlight, bounding=bounding)
+    def _draw_shapes(self, cr, bounding, highlighted, highlight_only):
+        for shape in self._visible(self.shapes, self.shapes_index, bounding):
+            highlight = shape in highlighted
+            if highlight or not highlight_only:
+                shape._draw(cr, highlight=highlight, bounding=bounding)
 
-    def draw(self, cr, highlight_items=None, bounding=None):
+    @staticmethod
+    def _draw_simplified(cr, elements, highlight, line_width=None):
+        """Draw the simplified shapes of the given elements in one go per
+        color."""
+        if not elements:
+            return
+        if highlight:
+            groups = {Pen.DEFAULT.highlighted().color: elements}
+        else:
+            groups = {}
+            for element in elements:
+                color = element.simplified_color or Pen.DEFAULT.color
+                groups.setdefault(color, []).append(element)
+        if line_width is not None:
+            cr.set_dash([])
+            cr.set_line_width(line_width)
+        for color, group in groups.items():
+            cr.set_source_rgba(*color)
+            for element in group:
+                if line_width is None:
+                    element._draw_box(cr)
+                else:
+                    element._draw_polyline(cr)
+            if line_width is None:
+                cr.fill()
+            else:
+                cr.stroke()
+
+    def _draw_nodes(self, cr, bounding, highlighted, highlight_only, scale, simplified):
+        # nodes too small to make out are drawn as boxes, without even
+        # decoding their shapes
+        min_size = self.node_lod_pixels/scale
+        boxes = ([], [])
+        for node in self._visible(self.nodes, self.nodes_index, bounding):
+            highlight = node in highlighted
+            if highlight or not highlight_only:
+                if simplified or (node.x2 - node.x1 < min_size and node.y2 - node.y1 < min_size):
+                    boxes[highlight].append(node)
+                else:
+                    node._draw(cr, highlight=highlight, bounding=bounding)
+        self._draw_simplified(cr, boxes[False], False)
+        self._draw_simplified(cr, boxes[True], True)
+
+    def _draw_edges(self, cr, bounding, highlighted, highlight_only, scale, simplified):
+        simplify = simplified or self.arrow_length*scale < self.edge_lod_pixels
+        polylines = ([], [])
+        for edge in self._visible(self.edges, self.edges_index, bounding):
+            should_highlight = edge in highlighted
+            if should_highlight or not highlight_only:
+                if simplify:
+                    polylines[should_highlight].append(edge)
+                else:
+                    edge._draw(cr, highlight=should_highlight, bounding=bounding)
+        # one pixel wide
+        self._draw_simplified(cr, polylines[False], False, 1/scale)
+        self._draw_simplified(cr, polylines[True], True, 1/scale)
+
+    def draw(self, cr, highlight_items=None, bounding=None, highlight_only=False, simplified=False):
+        """Draw the graph, or only its highlighted elements, e.g., over an
+        image of it drawn without any.
+
+        Nodes and edges are drawn with less detail when they're small on
+        screen, or always if simplified is true.  Only what's within both
+        the bounding and the clip is drawn."""
+        x0, y0, x1, y1 = cr.clip_extents()
         if bounding is not None:
-            if not self._intersects(bounding):
-                return
-            if self._fully_in(bounding):
-                bounding = None
+            x0 = max(x0, bounding[0])
+            y0 = max(y0, bounding[1])
+            x1 = min(x1, bounding[2])
+            y1 = min(y1, bounding[3])
+        bounding = (x0, y0, x1, y1)
+
+        if not self._intersects(bounding):
+            return
+        if self._fully_in(bounding):
+            bounding = None
 
-        if highlight_items is None:
-            highlight_items = ()
+        highlighted = self.get_highlighted(highlight_items)
         cr.set_source_rgba(0.0, 0.0, 0.0, 1.0)
 
         cr.set_line_cap(cairo.LINE_CAP_BUTT)
         cr.set_line_join(cairo.LINE_JOIN_MITER)
 
-        self._draw_shapes(cr, bounding, highlight_items)
+        self._draw_shapes(cr, bounding, highlighted, highlight_only)
+
+        # level of detail depends on the size on screen
+        scale = _get_device_scale(cr)
 
         if self.outputorder == 'edgesfirst':
-            self._draw_edges(cr, bounding, highlight_items)
-            self._draw_nodes(cr, bounding, highlight_items)
+            self._draw_edges(cr, bounding, highlighted, highlight_only, scale, simplified)
+            self._draw_nodes(cr, bounding, highlighted, highlight_only, scale, simplified)
         else:
-            self._draw_nodes(cr, bounding, highlight_items)
-            self._draw_edges(cr, bounding, highlight_items)
+            self._draw_nodes(cr, bounding, highlighted, highlight_only, scale, simplified)
+            self._draw_edges(cr, bounding, highlighted, highlight_only, scale, simplified)
+
+    def _propagate_highlight(self, items):
+        highlighted = set(items)
+        for item in items:
+            if isinstance(item, Edge):
+                highlighted.add(item.src)
+                highlighted.add(item.dst)
+            elif isinstance(item, Node):
+                highlighted.update(self.node_edges.get(item, ()))
+        return frozenset(highlighted)
+
+    def get_highlighted(self, items):
+        """Set of all that highlighting the given items highlights, i.e.,
+        the items, the nodes of edges, and the edges of nodes.
+
+        The set for the last items is kept, so that it's only worked out
+        again when the highlight changes."""
+        if not items:
+            return frozenset()
+        last_items, highlighted = self._highlight
+        if items is not last_items:
+            highlighted = self._propagate_highlight(items)
+            self._highlight = items, highlighted
+        return highlighted
+
+    def get_highlight_bounding(self, items):
+        """Bounding box of all that highlighting the given items changes."""
+        return Shape._envelope_bounds(map(_get_bounding, self._propagate_highlight(items)))
+
+    def _get_nodes_hit_index(self):
+        if self._nodes_hit_index is None:
+            self._nodes_hit_index = GridIndex(self.nodes, [(node.x1, node.y1, node.x2, node.y2) for node in self.nodes])
+        return self._nodes_hit_index
+
+    def _get_edges_hit_index(self):
+        if self._edges_hit_index is None:
+            self._edges_hit_index = GridIndex(self.edges, [edge.get_hit_bounding() for edge in self.edges])
+        return self._edges_hit_index
+
+    def _nodes_near(self, x, y):
+        """Nodes which might contain the given point, in order."""
+        return self._get_nodes_hit_index().query(x, y, x, y)
+
+    def _edges_near(self, x, y, radius):
+        """Edges which might be within radius of the given point, in order."""
+        return self._get_edges_hit_index().query(x - radius, y - radius, x + radius, y + radius)
 
     def get_element(self, x, y, radius):
-        for node in self.nodes:
+        for node in self._nodes_near(x, y):
             if node.is_inside(x, y, radius):
                 return node
-        for edge in self.edges:
+        for edge in self._edges_near(x, y, radius):
             if edge.is_inside(x, y, radius):
                 return edge
         return None
 
     def get_url(self, x, y, radius):
-        for node in self.nodes:
+        for node in self._nodes_near(x, y):
             url = node.get_url(x, y, radius)
             if url is not None:
                 return url
-        for edge in self.edges:
+        for edge in self._edges_near(x, y, radius):
             url = edge.get_url(x, y, radius)
             if url is not None:
                 return url
         return None
 
+    def pick(self, x, y, radius, to_dst=False):
+        """Find the element, Url, and Jump under the given point.
+
+        Equivalent to calling get_element, get_url, and get_jump, but each
+        element is only tested once."""
+        node_element = node_url = node_jump = None
+        for node in self._nodes_near(x, y):
+            inside, url, jump = node.pick(x, y, radius)
+            if inside:
+                if node_element is None:
+                    node_element, node_jump = node, jump
+                if url is not None:
+                    node_url = url
+                    break
+
+        # edges are only needed for whatever the nodes didn't provide, but
+        # take precedence over them for jumps
+        edge_element = edge_url = edge_jump = None
+        for edge in self._edges_near(x, y, radius):
+            if (node_element is not None or edge_element is not None) and \
+               (node_url is not None or edge_url is not None) and \
+               edge_jump is not None:
+                break
+            inside, url, jump = edge.pick(x, y, radius, to_dst)
+            if inside and edge_element is None:
+                edge_element = edge
+            if url is not None and edge_url is None:
+                edge_url = url
+            if jump is not None and edge_jump is None:
+                edge_jump = jump
+
+        return (node_element or edge_element,
+                node_url or edge_url,
+                edge_jump or node_jump)
+
+    def pick_region(self, x, y, radius, element):
+        """Find a PickRegion around the point, given the element picked there.
+
+        Only empty space, and nodes clear of other elements, have regions,
+        as anywhere else the result depends on the distance to edge curves.
+        Returns None when there's no such region."""
+        if element is None:
+            size = 4*radius
+            bounding = (x - size, y - size, x + size, y + size)
+        elif isinstance(element, Node):
+            bounding = (element.x1, element.y1, element.x2, element.y2)
+        else:
+            return None
+
+        x1, y1, x2, y2 = bounding
+        holes = []
+        for node in self._get_nodes_hit_index().query(x1, y1, x2, y2):
+            if node is not element:
+                holes.append((node.x1, node.y1, node.x2, node.y2))
+        for edge in self._get_edges_hit_index().query(x1 - radius, y1 - radius, x2 + radius, y2 + radius):
+            holes.extend(edge.get_hit_boxes(radius))
+
+        region = PickRegion(self, radius, bounding, holes)
+        if not region.contains(self, x, y, radius):
+            # other elements might be under the point too
+            return None
+        return region
+
     def get_jump(self, x, y, radius, to_dst = False):
-        for edge in self.edges:
+        for edge in self._edges_near(x, y, radius):
             jump = edge.get_jump(x, y, radius, to_dst)
             if jump is not None:
                 return jump
-        for node in self.nodes:
+        for node in self._nodes_near(x, y):
             jump = node.get_jump(x, y, radius)
             if jump is not None:
                 return jump
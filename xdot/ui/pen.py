@@ -16,7 +16,12 @@
 
 
 class Pen:
-    """Store pen attributes."""
+    """Store pen attributes.
+
+    Pens are immutable, so that shapes can share them.  Pens with modified
+    attributes are obtained with replace(), which interns them, so that
+    there is only one instance of each distinct pen.  Graphs seldom use more
+    than a few distinct pens, so interned pens are never released."""
 
     BOLD = 1
     ITALIC = 2
@@ -26,31 +31,83 @@ class Pen:
     STRIKE_THROUGH = 32
     OVERLINE = 64
 
+    attributes = (
+        'color',
+        'fillcolor',
+        'linewidth',
+        'fontsize',
+        'fontname',
+        'bold',
+        'italic',
+        'underline',
+        'superscript',
+        'subscript',
+        'strikethrough',
+        'overline',
+        'dash',
+    )
+
+    __slots__ = attributes + ('_highlighted', '_replacements')
+
+    # interned pens, by their attribute values
+    _interned = {}
+
     def __init__(self):
         # set default attributes
-        self.color = (0.0, 0.0, 0.0, 1.0)
-        self.fillcolor = (0.0, 0.0, 0.0, 1.0)
-        self.linewidth = 1.0
-        self.fontsize = 14.0
-        self.fontname = "Times-Roman"
-        self.bold = False
-        self.italic = False
-        self.underline = False
-        self.superscript = False
-        self.subscript = False
-        self.strikethrough = False
-        self.overline = False
-
-        self.dash = ()
+        set_attr = object.__setattr__
+        set_attr(self, 'color', (0.0, 0.0, 0.0, 1.0))
+        set_attr(self, 'fillcolor', (0.0, 0.0, 0.0, 1.0))
+        set_attr(self, 'linewidth', 1.0)
+        set_attr(self, 'fontsize', 14.0)
+        set_attr(self, 'fontname', "Times-Roman")
+        set_attr(self, 'bold', False)
+        set_attr(self, 'italic', False)
+        set_attr(self, 'underline', False)
+        set_attr(self, 'superscript', False)
+        set_attr(self, 'subscript', False)
+        set_attr(self, 'strikethrough', False)
+        set_attr(self, 'overline', False)
 
-    def copy(self):
-        """Create a copy of this pen."""
-        pen = Pen()
-        pen.__dict__ = self.__dict__.copy()
+        set_attr(self, 'dash', ())
+
+        set_attr(self, '_highlighted', None)
+        # pens previously returned by replace, by its arguments
+        set_attr(self, '_replacements', {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError('pens are immutable; use replace() instead')
+
+    def replace(self, **attrs):
+        """Return the interned pen with the given attributes changed."""
+        args = tuple(attrs.items())
+        try:
+            return self._replacements[args]
+        except KeyError:
+            pass
+
+        key = tuple([attrs.get(name, getattr(self, name)) for name in self.attributes])
+        try:
+            pen = self._interned[key]
+        except KeyError:
+            pen = Pen()
+            set_attr = object.__setattr__
+            for name, value in zip(self.attributes, key):
+                set_attr(pen, name, value)
+            self._interned[key] = pen
+        self._replacements[args] = pen
         return pen
 
+    def copy(self):
+        """Pens are immutable, so this returns the pen itself."""
+        return self
+
     def highlighted(self):
-        pen = self.copy()
-        pen.color = (1, 0, 0, 1)
-        pen.fillcolor = (1, .8, .8, 1)
+        pen = self._highlighted
+        if pen is None:
+            pen = self.replace(color=(1, 0, 0, 1), fillcolor=(1, .8, .8, 1))
+            object.__setattr__(self, '_highlighted', pen)
         return pen
+
+
+# interned pen with the default attributes
+Pen.DEFAULT = Pen().replace()
@@ -0,0 +1,120 @@
+# Copyright 2008-2022 Jose Fonseca
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+'''Spatial indexing of bounding boxes.'''
+
+import math
+
+
+class GridIndex:
+    """Uniform grid over the bounding boxes of a sequence of items.
+
+    Finds the items whose bounding box intersects a rectangle, in their
+    original order, in time proportional to the number of items found.
+
+    Bounding boxes are (x0, y0, x1, y1) tuples.  Boxes which are infinite
+    along one axis are kept in a column or row of the grid, and boxes which
+    cover too many cells or are infinite along both axes are tested on every
+    query."""
+
+    # maximum number of cells per side
+    max_size = 512
+
+    # items covering more cells than this are tested one by one instead
+    max_item_cells = 16
+
+    def __init__(self, items, boundings):
+        self.items = items = list(items)
+        self.boundings = boundings = list(boundings)
+
+        xs = [coord for x0, y0, x1, y1 in boundings if math.isfinite(x0) and math.isfinite(x1) for coord in (x0, x1)]
+        ys = [coord for x0, y0, x1, y1 in boundings if math.isfinite(y0) and math.isfinite(y1) for coord in (y0, y1)]
+        size = max(1, min(self.max_size, int(math.sqrt(len(items)))))
+        self.x, self.ncols, self.width = self._axis(xs, size)
+        self.y, self.nrows, self.height = self._axis(ys, size)
+
+        self.cells = {}
+        self.columns = {}
+        self.rows = {}
+        self.large = []
+        for index, (x0, y0, x1, y1) in enumerate(boundings):
+            finite_x = math.isfinite(x0) and math.isfinite(x1)
+            finite_y = math.isfinite(y0) and math.isfinite(y1)
+            if finite_x:
+                c0, c1 = self._cols(x0, x1)
+            if finite_y:
+                r0, r1 = self._rows(y0, y1)
+            if finite_x and finite_y and (c1 - c0 + 1)*(r1 - r0 + 1) <= self.max_item_cells:
+                for r in range(r0, r1 + 1):
+                    for c in range(c0, c1 + 1):
+                        self.cells.setdefault(r*self.ncols + c, []).append(index)
+            elif finite_x and not finite_y and c1 - c0 < self.max_item_cells:
+                for c in range(c0, c1 + 1):
+                    self.columns.setdefault(c, []).append(index)
+            elif finite_y and not finite_x and r1 - r0 < self.max_item_cells:
+                for r in range(r0, r1 + 1):
+                    self.rows.setdefault(r, []).append(index)
+            else:
+                self.large.append(index)
+
+    @staticmethod
+    def _axis(coords, size):
+        """Origin, number of cells, and cell size along one axis."""
+        if not coords:
+            return 0.0, 1, 1.0
+        lo, hi = min(coords), max(coords)
+        if hi <= lo:
+            return lo, 1, 1.0
+        return lo, size, (hi - lo)/size
+
+    def _span(self, lo, hi, origin, count, size):
+        i0 = int((lo - origin)/size) if math.isfinite(lo) else 0
+        i1 = int((hi - origin)/size) if math.isfinite(hi) else count - 1
+        return min(max(i0, 0), count - 1), min(max(i1, 0), count - 1)
+
+    def _cols(self, x0, x1):
+        return self._span(x0, x1, self.x, self.ncols, self.width)
+
+    def _rows(self, y0, y1):
+        return self._span(y0, y1, self.y, self.nrows, self.height)
+
+    def __len__(self):
+        return len(self.items)
+
+    def query(self, x0, y0, x1, y1):
+        """Return the items intersecting the given rectangle, in order."""
+        c0, c1 = self._cols(x0, x1)
+        r0, r1 = self._rows(y0, y1)
+
+        found = set(self.large)
+        cells = self.cells
+        ncols = self.ncols
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                found.update(cells.get(r*ncols + c, ()))
+        for c in range(c0, c1 + 1):
+            found.update(self.columns.get(c, ()))
+        for r in range(r0, r1 + 1):
+            found.update(self.rows.get(r, ()))
+
+        items = self.items
+        boundings = self.boundings
+        result = []
+        for index in sorted(found):
+            x2, y2, x3, y3 = boundings[index]
+            if x2 <= x1 and x0 <= x3 and y2 <= y1 and y0 <= y3:
+                result.append(items[index])
+        return result
@@ -0,0 +1,152 @@
+# Copyright 2008-2022 Jose Fonseca
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+'''Tiled rendering of graphs.'''
+
+import collections
+import math
+
+import cairo
+
+
+class TileCache:
+    """Rasterized tiles of a graph, kept in a least recently used cache.
+
+    Tiles are rendered at zoom ratios quantized to a few levels per octave,
+    and scaled to the actual zoom ratio when painted, so that panning only
+    renders the tiles which weren't visible before.  The least recently
+    used tiles are discarded when they take more memory than the budget."""
+
+    # width and height of the tiles, in pixels
+    tile_size = 256
+
+    # zoom levels per doubling of the zoom ratio
+    levels_per_octave = 8
+
+    def __init__(self, budget=64*1024*1024):
+        self.budget = budget
+        self.tiles = collections.OrderedDict()
+        self.size = 0
+        self.graph = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def clear(self):
+        self.tiles.clear()
+        self.size = 0
+
+    def get_level(self, zoom_ratio):
+        """Quantized zoom level, and its zoom ratio."""
+        level = round(math.log2(zoom_ratio)*self.levels_per_octave)
+        return level, 2.0**(level/self.levels_per_octave)
+
+    def draw(self, cr, graph, x, y, zoom_ratio, width, height, highlight_items=None):
+        """Paint a width by height area with the graph, zoomed by zoom_ratio
+        around the point x, y of the graph.
+
+        Highlighted elements are drawn over the tiles, which never have
+        any."""
+        if graph is not self.graph:
+            self.clear()
+            self.graph = graph
+
+        level, level_ratio = self.get_level(zoom_ratio)
+        scale = zoom_ratio/level_ratio
+        size = self.tile_size
+
+        # origin of the area, in pixels of the zoom level
+        x0 = x*level_ratio - 0.5*width/scale
+        y0 = y*level_ratio - 0.5*height/scale
+        if scale == 1:
+            # align tiles with the pixels, so that they're copied unfiltered
+            x0 = round(x0)
+            y0 = round(y0)
+
+        x1 = x0 + width/scale
+        y1 = y0 + height/scale
+
+        # only the tiles with something in them
+        gx0, gy0, gx1, gy1 = graph.bounding
+        col0, col1 = self._span(x0, x1, gx0*level_ratio, gx1*level_ratio)
+        row0, row1 = self._span(y0, y1, gy0*level_ratio, gy1*level_ratio)
+
+        cr.save()
+        cr.scale(scale, scale)
+        cr.translate(-x0, -y0)
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                tile = self.get_tile(cr, graph, level, level_ratio, col, row)
+                cr.set_source_surface(tile, col*size, row*size)
+                # avoid seams between tiles when scaling
+                cr.get_source().set_extend(cairo.EXTEND_PAD)
+                cr.rectangle(col*size, row*size, size, size)
+                cr.fill()
+
+        if highlight_items:
+            cr.scale(level_ratio, level_ratio)
+            bounding = (x0/level_ratio, y0/level_ratio, x1/level_ratio, y1/level_ratio)
+            graph.draw(cr, highlight_items=highlight_items, bounding=bounding, highlight_only=True)
+        cr.restore()
+
+    def _span(self, lo, hi, graph_lo, graph_hi):
+        """Range of tile indices covering both intervals."""
+        lo = max(lo, graph_lo)
+        hi = min(hi, graph_hi)
+        if not lo <= hi:
+            return 0, -1
+        return math.floor(lo/self.tile_size), math.floor(hi/self.tile_size)
+
+    def get_tile(self, cr, graph, level, level_ratio, col, row):
+        key = level, col, row
+        try:
+            tile = self.tiles[key]
+        except KeyError:
+            self.misses += 1
+            tile = self.render_tile(cr, graph, level_ratio, col, row)
+            self.tiles[key] = tile
+            # 32 bits per pixel
+            tile_bytes = 4*self.tile_size*self.tile_size
+            self.size += tile_bytes
+            while self.size > self.budget and len(self.tiles) > 1:
+                self.tiles.popitem(last=False)
+                self.size -= tile_bytes
+        else:
+            self.hits += 1
+            self.tiles.move_to_end(key)
+        return tile
+
+    def render_tile(self, cr, graph, level_ratio, col, row):
+        size = self.tile_size
+        # similar to the target, for fast painting
+        tile = cr.get_target().create_similar(cairo.CONTENT_COLOR_ALPHA, size, size)
+        x0 = col*size/level_ratio
+        y0 = row*size/level_ratio
+        x1 = (col + 1)*size/level_ratio
+        y1 = (row + 1)*size/level_ratio
+
+        tile_cr = cairo.Context(tile)
+        tile_cr.scale(level_ratio, level_ratio)
+        tile_cr.translate(-x0, -y0)
+        # a pixel more, for antialiasing
+        margin = 1/level_ratio
+        graph.draw(tile_cr, bounding=(x0 - margin, y0 - margin, x1 + margin, y1 + margin))
+        return tile
+
+    def __str__(self):
+        return '%u tiles, %u KiB, %u hits, %u misses' % (len(self.tiles), self.size // 1024, self.hits, self.misses)
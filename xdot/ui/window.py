@@ -19,6 +19,7 @@ import os
 import re
 import subprocess
 import sys
+import threading
 import time
 import operator
 
@@ -30,6 +31,7 @@ from gi.repository import GLib
 from gi.repository import GObject
 from gi.repository import Gtk
 from gi.repository import Gdk
+import cairo
 
 # See http://www.graphviz.org/pub/scm/graphviz-cairo/plugin/cairo/gvrender_cairo.c
 
@@ -38,16 +40,25 @@ from gi.repository import Gdk
 # - http://comix.sourceforge.net/
 
 from . import actions
-from ..dot.lexer import ParseError
-from ._xdotparser import XDotParser
+from ..dot.lexer import EOF, ParseError
+from ._xdotparser import XDotParser, XDotGraphs
 from . import animation
 from . import actions
 from .elements import Graph
+from .tiles import TileCache
 
 
 class DotWidget(Gtk.DrawingArea):
     """GTK widget that draws dot graphs."""
 
+    # how long the view must stay still after being panned, zoomed, or
+    # animated, before the graph is drawn in full quality again, in ms
+    interaction_delay = 200
+
+    # how far from whole pixels panning may be, to shift the last frame
+    # rather than drawing it anew, in pixels
+    scroll_tolerance = 0.01
+
     # TODO GTK3: Second argument has to be of type Gdk.EventButton instead of object.
     __gsignals__ = {
         'clicked': (GObject.SignalFlags.RUN_LAST, None, (str, object)),
@@ -62,6 +73,8 @@ class DotWidget(Gtk.DrawingArea):
         Gtk.DrawingArea.__init__(self)
 
         self.graph = Graph()
+        self.graphs = [self.graph]
+        self.graph_number = 0
         self.openfilename = None
 
         self.set_can_focus(True)
@@ -96,6 +109,9 @@ class DotWidget(Gtk.DrawingArea):
         self.highlight_search = False
         self.history_back = []
         self.history_forward = []
+        self.tiles = None
+        self.snapshot = None
+        self.interaction_id = None
 
         self.zoom_gesture = Gtk.GestureZoom.new(self)
         self.zoom_gesture.connect("scale-changed", self.on_scale_changed)
@@ -132,15 +148,90 @@ class DotWidget(Gtk.DrawingArea):
             self.error_dialog(error)
         return xdotcode
 
+    def filter_graphs(self, dotcode):
+        """Run the filter on the dot code, and parse its xdot output while it
+        is still being written, without ever holding all of it in memory.
+
+        Returns a sequence with the graphs, of which only the first has been
+        parsed."""
+        graphviz_version = self.get_graphviz_version()
+        try:
+            p = subprocess.Popen(
+                [self.filter, '-Txdot'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                shell=False,
+                universal_newlines=False
+            )
+        except OSError as exc:
+            self.error_dialog('%s: %s' % (self.filter, exc.strerror))
+            return None
+
+        # Feed the input and collect the errors from other threads, so that
+        # neither pipe fills up and blocks the filter while we're parsing.
+        def write_input():
+            try:
+                p.stdin.write(dotcode)
+                p.stdin.close()
+            except BrokenPipeError:
+                pass
+
+        errors = []
+        threads = [
+            threading.Thread(target=write_input),
+            threading.Thread(target=lambda: errors.append(p.stderr.read())),
+        ]
+        for thread in threads:
+            thread.start()
+
+        graphs = None
+        parse_error = None
+        try:
+            parser = XDotParser(None, graphviz_version=graphviz_version, fp=p.stdout, lazy=True)
+            try:
+                parser.parse_graph()
+            except ParseError as ex:
+                parse_error = ex
+                # drain any remaining output so that the filter can terminate
+                while p.stdout.read(parser.lexer.chunksize):
+                    pass
+            else:
+                xdotcode = None
+                if parser.lookahead.type != EOF:
+                    # keep the remaining graphs in memory, to navigate them
+                    lexer = parser.lexer
+                    xdotcode = lexer.buf[parser.lookahead.pos - lexer.base:] + p.stdout.read()
+                graphs = [parser.make_graph()]
+                if xdotcode is not None:
+                    graphs = XDotGraphs(xdotcode, graphviz_version, first=graphs[0], lazy=True)
+        finally:
+            for thread in threads:
+                thread.join()
+            p.stdout.close()
+            p.wait()
+
+        error = b''.join(errors).decode().rstrip()
+        if error:
+            sys.stderr.write(error + '\n')
+        if p.returncode != 0:
+            self.error_dialog(error)
+            return None
+        if parse_error is not None:
+            raise parse_error
+        return graphs
+
     def _set_dotcode(self, dotcode, filename=None, center=True):
         # By default DOT language is UTF-8, but it accepts other encodings
         assert isinstance(dotcode, bytes)
-        xdotcode = self.run_filter(dotcode)
-            
-        if xdotcode is None:
-            return False
         try:
-            self.set_xdotcode(xdotcode, center=center)
+            if self.filter:
+                graphs = self.filter_graphs(dotcode)
+                if graphs is None:
+                    return False
+                self.set_graphs(graphs, center=center)
+            else:
+                self.set_xdotcode(dotcode, center=center)
         except ParseError as ex:
             self.error_dialog(str(ex))
             return False
@@ -158,20 +249,47 @@ class DotWidget(Gtk.DrawingArea):
             self.openfilename = filename
             return True
 
-    def set_xdotcode(self, xdotcode, center=True):
-        assert isinstance(xdotcode, bytes)
-
+    def get_graphviz_version(self):
         if self.graphviz_version is None and self.filter is not None:
             stdout = subprocess.check_output([self.filter, '-V'], stderr=subprocess.STDOUT)
             stdout = stdout.rstrip()
             mo = re.match(br'^.* - .* version (?P<version>.*) \(.*\)$', stdout)
             assert mo
             self.graphviz_version = mo.group('version').decode('ascii')
+        return self.graphviz_version
+
+    def set_xdotcode(self, xdotcode, center=True):
+        assert isinstance(xdotcode, bytes)
 
-        parser = XDotParser(xdotcode, graphviz_version=self.graphviz_version)
-        self.graph = parser.parse()
+        graphs = XDotGraphs(xdotcode, graphviz_version=self.get_graphviz_version(), lazy=True)
+        self.set_graphs(graphs, center=center)
+
+    def set_graphs(self, graphs, center=True):
+        """Show the first of a sequence of graphs."""
+        self.graph = graphs[0]
+        self.graphs = graphs
+        self.graph_number = 0
         self.zoom_image(self.zoom_ratio, center=center)
 
+    def set_graph_number(self, number):
+        """Show another graph of the sequence."""
+        if 0 <= number < len(self.graphs) and number != self.graph_number:
+            try:
+                graph = self.graphs[number]
+            except ParseError as ex:
+                self.error_dialog(str(ex))
+                return
+            self.graph = graph
+            self.graph_number = number
+            self.set_highlight(None, search=True)
+            self.zoom_image(self.zoom_ratio, center=True)
+
+    def on_next_graph(self, action=None):
+        self.set_graph_number(self.graph_number + 1)
+
+    def on_prev_graph(self, action=None):
+        self.set_graph_number(self.graph_number - 1)
+
     def reload(self):
         if self.openfilename is not None:
             try:
@@ -197,10 +315,37 @@ class DotWidget(Gtk.DrawingArea):
                 self.reload()
         return True
 
-    def _draw_graph(self, cr, rect):
+    def set_tiled(self, tiled, budget=64*1024*1024):
+        """Enable or disable drawing the graph from cached tiles, taking up
+        to budget bytes, rather than drawing it anew on every expose."""
+        if tiled:
+            self.tiles = TileCache(budget)
+        else:
+            self.tiles = None
+        self.snapshot = None
+        self.queue_draw()
+
+    def queue_interactive_draw(self):
+        """Redraw quickly, from a snapshot of the last frame drawn in full
+        quality, until the view stays still for a while."""
+        if self.interaction_id is not None:
+            GLib.source_remove(self.interaction_id)
+        self.interaction_id = GLib.timeout_add(self.interaction_delay, self.on_interaction_idle)
+        self.queue_draw()
+
+    def on_interaction_idle(self):
+        self.interaction_id = None
+        self.queue_draw()
+        return False
+
+    def _draw_graph(self, cr, rect, tiles=None, simplified=False):
         w, h = float(rect.width), float(rect.height)
         cx, cy = 0.5 * w, 0.5 * h
         x, y, ratio = self.x, self.y, self.zoom_ratio
+
+        if tiles is not None:
+            tiles.draw(cr, self.graph, x, y, ratio, w, h, highlight_items=self.highlight)
+            return
         x0, y0 = x - cx / ratio, y - cy / ratio
         x1, y1 = x0 + w / ratio, y0 + h / ratio
         bounding = (x0, y0, x1, y1)
@@ -208,7 +353,126 @@ class DotWidget(Gtk.DrawingArea):
         cr.translate(cx, cy)
         cr.scale(ratio, ratio)
         cr.translate(-x, -y)
-        self.graph.draw(cr, highlight_items=self.highlight, bounding=bounding)
+        self.graph.draw(cr, highlight_items=self.highlight, bounding=bounding, simplified=simplified)
+
+    def _draw_snapshot(self, cr, rect):
+        """Draw the graph in full quality through an offscreen surface, and
+        keep it for drawing while the view changes."""
+        surface = cr.get_target().create_similar(cairo.CONTENT_COLOR_ALPHA, rect.width, rect.height)
+        self._draw_graph(cairo.Context(surface), rect)
+        self.snapshot = surface, self.graph, self.highlight, self.x, self.y, self.zoom_ratio, rect.width, rect.height
+        cr.set_source_surface(surface, 0, 0)
+        cr.paint()
+
+    def _update_snapshot(self, cr, rect):
+        """Draw the graph by updating the snapshot, if the view was just
+        panned by whole pixels, or the highlight changed within the clip.
+
+        Only the strips exposed by panning, or the clip, are drawn anew.
+        Return whether it could."""
+        if self.snapshot is None:
+            return False
+        surface, graph, highlight, x, y, zoom_ratio, width, height = self.snapshot
+        if graph is not self.graph or \
+           zoom_ratio != self.zoom_ratio or \
+           width != rect.width or height != rect.height:
+            return False
+
+        dx = (x - self.x)*zoom_ratio
+        dy = (y - self.y)*zoom_ratio
+        if abs(dx - round(dx)) > self.scroll_tolerance or \
+           abs(dy - round(dy)) > self.scroll_tolerance:
+            return False
+        dx = round(dx)
+        dy = round(dy)
+        if abs(dx) >= width or abs(dy) >= height:
+            return False
+
+        strips = []
+        if dx or dy:
+            if highlight is not self.highlight:
+                return False
+
+            # where the pixels actually are, so that rounding never accumulates
+            x -= dx/zoom_ratio
+            y -= dy/zoom_ratio
+
+            scrolled = surface.create_similar(cairo.CONTENT_COLOR_ALPHA, width, height)
+            scrolled_cr = cairo.Context(scrolled)
+            scrolled_cr.set_source_surface(surface, dx, dy)
+            scrolled_cr.paint()
+            surface = scrolled
+
+            # exposed columns, then the rest of the exposed rows
+            if dx > 0:
+                strips.append((0, 0, dx, height))
+            elif dx < 0:
+                strips.append((width + dx, 0, -dx, height))
+            if dy > 0:
+                strips.append((max(dx, 0), 0, width - abs(dx), dy))
+            elif dy < 0:
+                strips.append((max(dx, 0), height + dy, width - abs(dx), -dy))
+        elif highlight is not self.highlight:
+            # set_highlight() invalidated all that changed
+            x0, y0, x1, y1 = cr.clip_extents()
+            x0 = max(math.floor(x0), 0)
+            y0 = max(math.floor(y0), 0)
+            x1 = min(math.ceil(x1), width)
+            y1 = min(math.ceil(y1), height)
+            strips.append((x0, y0, x1 - x0, y1 - y0))
+
+        # a pixel more, for antialiasing
+        margin = 1/zoom_ratio
+        strip_cr = cairo.Context(surface)
+        for sx, sy, sw, sh in strips:
+            strip_cr.save()
+            strip_cr.rectangle(sx, sy, sw, sh)
+            strip_cr.clip()
+            strip_cr.set_operator(cairo.OPERATOR_CLEAR)
+            strip_cr.paint()
+            strip_cr.set_operator(cairo.OPERATOR_OVER)
+            strip_cr.translate(0.5*width, 0.5*height)
+            strip_cr.scale(zoom_ratio, zoom_ratio)
+            strip_cr.translate(-x, -y)
+            x0 = x + (sx - 0.5*width)/zoom_ratio
+            y0 = y + (sy - 0.5*height)/zoom_ratio
+            bounding = (x0 - margin, y0 - margin, x0 + sw/zoom_ratio + margin, y0 + sh/zoom_ratio + margin)
+            self.graph.draw(strip_cr, highlight_items=self.highlight, bounding=bounding)
+            strip_cr.restore()
+
+        self.snapshot = surface, graph, self.highlight, x, y, zoom_ratio, width, height
+        cr.set_source_surface(surface, 0, 0)
+        cr.paint()
+        return True
+
+    def _draw_interactive(self, cr, rect):
+        """Draw the graph quickly, by transforming the last snapshot, and
+        drawing what it lacks with less detail."""
+        if self.snapshot is None or self.snapshot[1] is not self.graph:
+            self._draw_graph(cr, rect, simplified=True)
+            return
+        surface, graph, highlight, x, y, zoom_ratio, width, height = self.snapshot
+
+        # where the snapshot is now
+        scale = self.zoom_ratio / zoom_ratio
+        x0 = 0.5*rect.width + scale*((x - self.x)*zoom_ratio - 0.5*width)
+        y0 = 0.5*rect.height + scale*((y - self.y)*zoom_ratio - 0.5*height)
+        x1 = x0 + scale*width
+        y1 = y0 + scale*height
+
+        if x0 > 0 or y0 > 0 or x1 < rect.width or y1 < rect.height:
+            cr.save()
+            cr.set_fill_rule(cairo.FILL_RULE_EVEN_ODD)
+            cr.rectangle(0, 0, rect.width, rect.height)
+            cr.rectangle(x0, y0, x1 - x0, y1 - y0)
+            cr.clip()
+            self._draw_graph(cr, rect, simplified=True)
+            cr.restore()
+
+        cr.translate(x0, y0)
+        cr.scale(scale, scale)
+        cr.set_source_surface(surface, 0, 0)
+        cr.paint()
 
     def on_draw(self, widget, cr):
         rect = self.get_allocation()
@@ -216,7 +480,14 @@ class DotWidget(Gtk.DrawingArea):
                               rect.width, rect.height)
 
         cr.save()
-        self._draw_graph(cr, rect)
+        if self.tiles is not None:
+            # the tiles already make panning and zooming cheap
+            self._draw_graph(cr, rect, self.tiles)
+        elif not self._update_snapshot(cr, rect):
+            if self.interaction_id is not None:
+                self._draw_interactive(cr, rect)
+            else:
+                self._draw_snapshot(cr, rect)
         cr.restore()
 
         self.drag_action.draw(cr)
@@ -239,8 +510,32 @@ class DotWidget(Gtk.DrawingArea):
         if self.highlight_search and not search:
             return
         if self.highlight != items:
+            old_items = self.highlight
             self.highlight = items
+            self._queue_draw_highlight(old_items, items)
+
+    def _queue_draw_highlight(self, old_items, new_items):
+        """Invalidate only the area where the highlight changes."""
+        items = list(old_items or ()) + list(new_items or ())
+        if not items:
+            return
+        x0, y0, x1, y1 = self.graph.get_highlight_bounding(items)
+        if not all(map(math.isfinite, (x0, y0, x1, y1))):
+            # unbounded shapes
             self.queue_draw()
+            return
+        rect = self.get_allocation()
+        x0 = (x0 - self.x)*self.zoom_ratio + 0.5*rect.width
+        y0 = (y0 - self.y)*self.zoom_ratio + 0.5*rect.height
+        x1 = (x1 - self.x)*self.zoom_ratio + 0.5*rect.width
+        y1 = (y1 - self.y)*self.zoom_ratio + 0.5*rect.height
+        # a pixel more, for antialiasing
+        x0 = math.floor(max(x0 - 1, 0))
+        y0 = math.floor(max(y0 - 1, 0))
+        x1 = math.ceil(min(x1 + 1, rect.width))
+        y1 = math.ceil(min(y1 + 1, rect.height))
+        if x0 < x1 and y0 < y1:
+            self.queue_draw_area(x0, y0, x1 - x0, y1 - y0)
 
     def zoom_image(self, zoom_ratio, center=False, pos=None):
         # Constrain zoom ratio to a sane range to prevent numeric instability.
@@ -365,6 +660,12 @@ class DotWidget(Gtk.DrawingArea):
         if event.keyval == Gdk.KEY_w:
             self.zoom_to_fit()
             return True
+        if event.keyval == Gdk.KEY_bracketright:
+            self.on_next_graph()
+            return True
+        if event.keyval == Gdk.KEY_bracketleft:
+            self.on_prev_graph()
+            return True
         return False
 
     print_settings = None
@@ -434,9 +735,9 @@ class DotWidget(Gtk.DrawingArea):
 
     def on_hover(self, element, action, tooltip):
         """Override this method in a subclass to process
-        hover events. Note that hover events are triggered
-        for every move on an element, i.e. multiple hover
-        events will trigger for a single element
+        hover events. Note that hover events are only triggered
+        when the pointer moves onto a different element, and
+        not for every move on the same element
 
         :param xdot.ui.elements.Element element: the element that is being hovered
         :param xdot.ui.action.DragAction action: the action that triggered the hover (always a NullAction)
@@ -457,19 +758,16 @@ class DotWidget(Gtk.DrawingArea):
         self.drag_action = actions.NullAction(self)
         x, y = int(event.x), int(event.y)
         if self.is_click(event):
-            el = self.get_element(x, y)
+            ctrl_held = event.state & Gdk.ModifierType.CONTROL_MASK
+            el, url, jump = self.pick(x, y, to_dst=ctrl_held)
             if self.on_click(el, event):
                 return True
 
             if event.button == 1:
-                url = self.get_url(x, y)
                 if url is not None:
                     self.emit('clicked', url.url, event)
-                else:
-                    ctrl_held = event.state & Gdk.ModifierType.CONTROL_MASK
-                    jump = self.get_jump(x, y, to_dst=ctrl_held)
-                    if jump is not None:
-                        self.animate_to(jump.x, jump.y)
+                elif jump is not None:
+                    self.animate_to(jump.x, jump.y)
 
                 return True
 
@@ -481,14 +779,17 @@ class DotWidget(Gtk.DrawingArea):
         if event.direction == Gdk.ScrollDirection.UP:
             self.zoom_image(self.zoom_ratio * self.ZOOM_INCREMENT,
                             pos=(event.x, event.y))
+            self.queue_interactive_draw()
             return True
         elif event.direction == Gdk.ScrollDirection.DOWN:
             self.zoom_image(self.zoom_ratio / self.ZOOM_INCREMENT,
                             pos=(event.x, event.y))
+            self.queue_interactive_draw()
         else:
             deltas = event.get_scroll_deltas()
             self.zoom_image(self.zoom_ratio * (1 - deltas.delta_y / 10),
                             pos=(event.x, event.y))
+            self.queue_interactive_draw()
             return True
         return False
 
@@ -567,6 +868,10 @@ class DotWidget(Gtk.DrawingArea):
         x, y = self.window2graph(x, y)
         return self.graph.get_jump(x, y, self.hit_radius, to_dst)
 
+    def pick(self, x, y, to_dst=False):
+        x, y = self.window2graph(x, y)
+        return self.graph.pick(x, y, self.hit_radius, to_dst)
+
 
 class FindMenuToolAction(Gtk.Action):
     __gtype_name__ = "FindMenuToolAction"